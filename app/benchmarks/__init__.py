@@ -0,0 +1,3 @@
+from .generator import generate_tree, generate_workbook
+from .runner import run_benchmark
+from .startup import run_startup_benchmark
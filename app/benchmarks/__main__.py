@@ -0,0 +1,55 @@
+from contextlib import redirect_stdout
+from .runner import run_benchmark
+from .startup import run_startup_benchmark
+import argparse
+import warnings
+import json
+import sys
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description="Mede cada etapa do processamento em uma árvore sintética de distribuidoras"
+    )
+    parser.add_argument("--distribuidoras", dest="distributors", type=int, default=3)
+    parser.add_argument("--planilhas", dest="files_per_distributor", type=int, default=4)
+    parser.add_argument("--abas-extras", dest="filler_sheets", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--backend", choices=["xlsx", "openpyxl"], default="xlsx")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--pasta", dest="base_path", default=None, help="mantém a árvore gerada nesta pasta")
+    parser.add_argument("--saida", dest="output", default=None, help="arquivo JSON com o resultado")
+    parser.add_argument("--inicializacao", dest="startup", action="store_true", help="mede só o tempo de import de cada comando com python -X importtime")
+    parser.add_argument("--repeticoes", dest="repeat", type=int, default=5)
+
+    args = parser.parse_args()
+
+    warnings.filterwarnings("ignore", category=UserWarning, module="openpyxl")
+
+    if args.startup:
+        report = run_startup_benchmark(repeat=args.repeat)
+    else:
+        # the pipeline's progress messages go to stderr so stdout stays valid JSON
+        with redirect_stdout(sys.stderr):
+            report = run_benchmark(
+                distributors=args.distributors,
+                files_per_distributor=args.files_per_distributor,
+                filler_sheets=args.filler_sheets,
+                workers=args.workers,
+                backend=args.backend,
+                seed=args.seed,
+                base_path=args.base_path
+            )
+
+    report_json = json.dumps(report, ensure_ascii=False, indent=2)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            file.write(report_json)
+    else:
+        print(report_json)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+from openpyxl import Workbook
+from openpyxl.workbook.defined_name import DefinedName
+from datetime import datetime
+from typing import Literal
+from modules.extraction_plan import get_OM_plan, get_extraction_plan
+from modules.distributor_info import get_registry
+import random
+import os
+
+
+VPB_LABELS = {
+    165: ("Fator IGP- M", None),
+    170: ("Total", 4),
+    175: ("Ultrapassagem de Demanda", 4),
+    176: ("Excedente de Reativos", 4),
+    185: ("Receitas Irrecuperáveis de Encargos Setoriais", 3),
+    195: ("Demais Receitas Irrecuperáveis (VSE)", 3)
+}
+
+VPB1_LABELS = {
+    40: "Outras Receitas (OR)",
+    41: "Ultrapassagem de Demanda (UD)",
+    42: "Excedenete de Reativos (ER)"
+}
+
+RESULTADO_LABELS = {
+    35: "Receita Irrecuperável",
+    40: "Parcela B",
+    45: "Parcela B (menos outras receitas)",
+    50: "Parcela B"
+}
+
+
+def _fill_block(tab, rng: random.Random, max_row: int, max_column: int, density: float = 0.7):
+    for row in range(1, max_row + 1):
+        for column in range(1, max_column + 1):
+            if rng.random() < density:
+                tab.cell(row, column, round(rng.random() * 1000, 3))
+
+
+def _add_cover(workbook: Workbook, concession_id: any, process_date: datetime, contract_type: str):
+    cover = workbook.active
+    cover.title = "CAPA"
+
+    for row in range(1, 41):
+        cover.cell(row, 1, f"Campo {row}")
+
+    cover["C10"] = process_date
+    cover["C23"] = concession_id
+    cover["C27"] = contract_type
+    cover["C28"] = "Novo" if contract_type not in ("Antigo", "Novo") else "020/2001"
+    cover["M2"] = concession_id
+
+
+def _add_vpb(workbook: Workbook, rng: random.Random):
+    tab = workbook.create_sheet("VPB e Fator X")
+    _fill_block(tab, rng, max_row=200, max_column=8)
+
+    for row, (label, value_column) in VPB_LABELS.items():
+        tab.cell(row, 2, label)
+
+        if value_column:
+            tab.cell(row, value_column, round(rng.random() * 100, 4))
+
+
+def _add_vpb1(workbook: Workbook, rng: random.Random):
+    tab = workbook.create_sheet("VPB1")
+    _fill_block(tab, rng, max_row=60, max_column=7)
+
+    for row, label in VPB1_LABELS.items():
+        tab.cell(row, 2, label)
+        tab.cell(row, 3, round(rng.random() * 100, 4))
+
+
+def _add_resultado(workbook: Workbook, rng: random.Random):
+    tab = workbook.create_sheet("Resultado")
+    _fill_block(tab, rng, max_row=80, max_column=6)
+
+    for row, label in RESULTADO_LABELS.items():
+        tab.cell(row, 2, label)
+        tab.cell(row, 4, round(rng.random() * 10 ** 6, 2))
+
+
+def _add_mercado(workbook: Workbook, rng: random.Random, process_year: int):
+    tab = workbook.create_sheet("Mercado")
+    _fill_block(tab, rng, max_row=60, max_column=10)
+
+    if process_year % 2:
+        tab["H38"] = round(rng.random() * 100, 4)
+
+
+def _add_entrada(workbook: Workbook, rng: random.Random, process_year: int):
+    OM_plan = get_OM_plan()
+    items = OM_plan.items
+    sub_items = OM_plan.sub_items
+
+    tab = workbook.create_sheet("Entrada")
+    _fill_block(tab, rng, max_row=6, max_column=13)
+
+    tab["L7"] = process_year - 1
+    tab["M7"] = process_year - 2
+
+    row = 8
+
+    for index, item in enumerate(items):
+        tab.cell(row, 10, item.upper() if index == len(items) - 1 else f"Conta {item}")
+
+        for offset, sub_item in enumerate(sub_items[index]):
+            tab.cell(row + offset, 11, sub_item)
+            tab.cell(row + offset, 12, rng.randint(1, 10 ** 6))
+            tab.cell(row + offset, 13, round(rng.random() * 10 ** 6, 2))
+
+        row += len(sub_items[index])
+
+
+def _add_plan_cells(workbook: Workbook, rng: random.Random):
+    plan = get_extraction_plan()
+
+    for tab_name, cells in plan.cells_by_tab.items():
+        if tab_name in workbook.sheetnames:
+            tab = workbook[tab_name]
+        else:
+            tab = workbook.create_sheet(tab_name)
+
+        for row, column in cells:
+            tab.cell(row, column, round(rng.random() * 10 ** 6, 2))
+
+
+def generate_workbook(
+    file_path: str,
+    concession_id: any,
+    process_year: int,
+    type: Literal["Reajuste", "Revisão"],
+    contract_type: str,
+    rng: random.Random,
+    filler_sheets: int = 0,
+    with_defined_name: bool = True
+):
+    workbook = Workbook()
+
+    _add_cover(workbook, concession_id, datetime(process_year, 4, 22), contract_type)
+    _add_vpb(workbook, rng)
+    _add_vpb1(workbook, rng)
+    _add_resultado(workbook, rng)
+    _add_mercado(workbook, rng, process_year)
+
+    if type == "Revisão":
+        _add_entrada(workbook, rng, process_year)
+
+    if process_year % 3 == 0:
+        uderor = workbook.create_sheet("UDEROR")
+        uderor["C2"] = 1.1
+        uderor["C6"] = 2.2
+        uderor["C7"] = 3.3
+
+    if process_year % 4 == 0:
+        bd = workbook.create_sheet("BD")
+        bd["M63"] = 0.98
+
+    _add_plan_cells(workbook, rng)
+
+    for index in range(filler_sheets):
+        _fill_block(workbook.create_sheet(f"Auxiliar {index + 1}"), rng, max_row=300, max_column=20)
+
+    if with_defined_name:
+        workbook.defined_names["LnkTxtDRPData"] = DefinedName("LnkTxtDRPData", attr_text="CAPA!$C$10")
+
+    workbook.save(file_path)
+
+
+def _get_distributors(count: int) -> list[tuple[str, any]]:
+    registry = get_registry()
+    sigla_index = registry.header.index("SIGLA")
+    concession_index = registry.header.index("ID CONCESSÃO")
+
+    distributors = []
+
+    for row in registry.rows:
+        sigla = row[sigla_index]
+
+        if isinstance(sigla, str) and sigla.strip() and row[concession_index] is not None:
+            distributors.append((sigla, row[concession_index]))
+
+        if len(distributors) == count:
+            break
+
+    if len(distributors) < count:
+        raise ValueError(f"distribuidoras.xlsx só tem {len(distributors)} distribuidoras válidas")
+
+    return distributors
+
+
+def generate_tree(
+    base_path: str,
+    distributors: int = 3,
+    files_per_distributor: int = 4,
+    filler_sheets: int = 0,
+    seed: int = 0
+) -> list[str]:
+    rng = random.Random(seed)
+    file_paths = []
+
+    for distributor_index, (sigla, concession_id) in enumerate(_get_distributors(distributors)):
+        distributor_path = os.path.join(base_path, "Distribuidoras", sigla)
+
+        for type in ["Reajuste", "Revisão"]:
+            os.makedirs(os.path.join(distributor_path, type), exist_ok=True)
+
+        for file_index in range(files_per_distributor):
+            type = "Revisão" if file_index % 2 else "Reajuste"
+            suffix = ".xlsm" if file_index % 3 == 2 else ".xlsx"
+            file_path = os.path.join(distributor_path, type, f"processo_{file_index}{suffix}")
+
+            generate_workbook(
+                file_path=file_path,
+                concession_id=concession_id,
+                process_year=2024 - file_index - distributor_index % 3,
+                type=type,
+                contract_type=rng.choice(["Antigo", "Novo", "-"]),
+                rng=rng,
+                filler_sheets=filler_sheets,
+                with_defined_name=file_index % 2 == 0
+            )
+
+            file_paths.append(file_path)
+
+    return file_paths
@@ -0,0 +1,193 @@
+from contextlib import contextmanager
+from time import perf_counter
+from typing import Literal
+from modules.data import (
+    FileResult,
+    _attach_cover,
+    _consolidate_distributor,
+    _extract_file,
+    _get_file_jobs,
+    plan_misplaced_files,
+    process_data_bases
+)
+from modules.extraction_plan import get_extraction_plan
+from .generator import generate_tree
+import openpyxl
+import platform
+import subprocess
+import tempfile
+import shutil
+import sys
+import os
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+EXTRACTION_STAGES = ("open", "metadata", "fixed", "changing", "om", "assemble")
+
+
+class StageTimer:
+    def __init__(self):
+        self.stages = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        start = perf_counter()
+
+        try:
+            yield
+        finally:
+            self.add(name, perf_counter() - start)
+
+    def add(self, name: str, seconds: float):
+        total, calls = self.stages.get(name, (0.0, 0))
+        self.stages[name] = (total + seconds, calls + 1)
+
+    def to_json(self) -> dict[str, dict[str, float | int]]:
+        return {
+            name: {"seconds": round(seconds, 6), "calls": calls}
+            for name, (seconds, calls) in self.stages.items()
+        }
+
+
+def _get_peak_rss() -> dict[str, int | None]:
+    if resource is None:
+        return {"self": None, "children": None}
+
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    scale = 1 if sys.platform == "darwin" else 1024
+
+    return {
+        "self": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale,
+        "children": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * scale
+    }
+
+
+def _get_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=os.path.dirname(__file__),
+            capture_output=True,
+            text=True,
+            check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _extract_with_stages(timer: StageTimer, job, backend: Literal["xlsx", "openpyxl"]) -> FileResult:
+    # the pipeline's own spans, recorded by _extract_file, give the time of each extraction stage
+    result = _extract_file(job, backend=backend, profile=True)
+
+    for event in result.trace["events"]:
+        if event["name"] in EXTRACTION_STAGES:
+            timer.add(event["name"], event["dur"] / 1e6)
+
+    return result
+
+
+def run_benchmark(
+    distributors: int = 3,
+    files_per_distributor: int = 4,
+    filler_sheets: int = 0,
+    workers: int = 1,
+    backend: Literal["xlsx", "openpyxl"] = "xlsx",
+    seed: int = 0,
+    base_path: str | None = None
+) -> dict:
+    keep_tree = base_path is not None
+    base_path = base_path or tempfile.mkdtemp(prefix="sparta_benchmark_")
+
+    timer = StageTimer()
+
+    try:
+        with timer.stage("generate"):
+            file_paths = generate_tree(
+                base_path=base_path,
+                distributors=distributors,
+                files_per_distributor=files_per_distributor,
+                filler_sheets=filler_sheets,
+                seed=seed
+            )
+
+        total_bytes = sum(os.path.getsize(file_path) for file_path in file_paths)
+        distributors_path = os.path.join(base_path, "Distribuidoras")
+
+        get_extraction_plan()
+
+        with timer.stage("discovery"):
+            distributor_names = sorted(
+                name for name in os.listdir(distributors_path)
+                if os.path.isdir(os.path.join(distributors_path, name))
+            )
+            jobs = _get_file_jobs(distributors_path, distributor_names)
+
+        with timer.stage("covers"):
+            move_plan = plan_misplaced_files(workers=workers, base_path=base_path)
+
+        jobs = [_attach_cover(job, move_plan.covers) for job in jobs]
+
+        row_sets = {}
+        file_seconds = {}
+        failed_files = {}
+
+        for job in jobs:
+            start = perf_counter()
+            result = _extract_with_stages(timer, job, backend)
+            file_seconds[os.path.relpath(job.file_path, base_path)] = round(perf_counter() - start, 6)
+
+            if result.error is None:
+                row_sets.setdefault(job.distributor, []).append(result.row_set)
+            else:
+                failed_files[os.path.relpath(job.file_path, base_path)] = result.error
+
+        with timer.stage("consolidation"):
+            for distributor in distributor_names:
+                _consolidate_distributor(
+                    distributor_path=os.path.join(distributors_path, distributor),
+                    distributor=distributor,
+                    row_sets=row_sets.get(distributor, [])
+                )
+
+        with timer.stage("saving"):
+            process_data_bases(incremental=False, base_path=base_path)
+
+        stages = timer.to_json()
+        measured_seconds = sum(
+            stage["seconds"] for name, stage in stages.items()
+            if name != "generate"
+        )
+
+        peak_rss = _get_peak_rss()
+
+        return {
+            "commit": _get_commit(),
+            "python": platform.python_version(),
+            "openpyxl": openpyxl.__version__,
+            "config": {
+                "distributors": distributors,
+                "files_per_distributor": files_per_distributor,
+                "filler_sheets": filler_sheets,
+                "workers": workers,
+                "backend": backend,
+                "seed": seed
+            },
+            "files": len(file_paths),
+            "failed_files": failed_files,
+            "bytes": total_bytes,
+            "seconds": round(measured_seconds, 6),
+            "throughput": {
+                "files_per_second": round(len(file_paths) / measured_seconds, 3) if measured_seconds else None,
+                "megabytes_per_second": round(total_bytes / 2 ** 20 / measured_seconds, 3) if measured_seconds else None
+            },
+            "peak_rss_bytes": peak_rss,
+            "stages": stages,
+            "slowest_files": dict(sorted(file_seconds.items(), key=lambda item: item[1], reverse=True)[:10])
+        }
+    finally:
+        if not keep_tree:
+            shutil.rmtree(base_path, ignore_errors=True)
@@ -0,0 +1,84 @@
+from typing import NamedTuple
+import subprocess
+import sys
+import os
+
+
+APP_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# what each CLI command imports before it starts working
+COMMAND_IMPORTS = {
+    "cli": "import main",
+    "move": "from modules import move_misplaced_files",
+    "extract": "from modules import process_distributors",
+    "consolidate": "from modules import process_data_bases",
+    "remove-dbs": "from modules import remove_dbs"
+}
+
+
+class ImportTime(NamedTuple):
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def _parse_importtime(output: str) -> list[ImportTime]:
+    import_times = []
+
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        module = name.strip()
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+
+        import_times.append(ImportTime(module, int(self_us), int(cumulative_us), depth))
+
+    return import_times
+
+
+def _measure(statement: str) -> list[ImportTime]:
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=APP_PATH,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+
+    return _parse_importtime(completed.stderr)
+
+
+def _get_total_us(import_times: list[ImportTime]) -> int:
+    return sum(import_time.cumulative_us for import_time in import_times if import_time.depth == 0)
+
+
+def run_startup_benchmark(repeat: int = 5, limit: int = 10) -> dict:
+    # the interpreter's own startup imports are measured once and left out of every command
+    baselines = [_measure("pass") for _ in range(repeat)]
+    baseline_us = min(_get_total_us(baseline) for baseline in baselines)
+    baseline_modules = {import_time.module for baseline in baselines for import_time in baseline}
+    commands = {}
+
+    for command, statement in COMMAND_IMPORTS.items():
+        runs = [_measure(statement) for _ in range(repeat)]
+        fastest = min(runs, key=_get_total_us)
+        command_imports = [import_time for import_time in fastest if import_time.module not in baseline_modules]
+        heaviest = sorted(command_imports, key=lambda import_time: import_time.self_us, reverse=True)[:limit]
+
+        commands[command] = {
+            "statement": statement,
+            "seconds": round((_get_total_us(fastest) - baseline_us) / 1e6, 6),
+            "modules": len(command_imports),
+            "loads_openpyxl": any(import_time.module == "openpyxl" for import_time in fastest),
+            "heaviest": {import_time.module: import_time.self_us for import_time in heaviest}
+        }
+
+    return {
+        "python": sys.version.split()[0],
+        "repeat": repeat,
+        "baseline_seconds": round(baseline_us / 1e6, 6),
+        "commands": commands
+    }
@@ -1,8 +1,124 @@
-from modules import process_distributors, process_data_bases
+import argparse
 import warnings
 
 warnings.filterwarnings("ignore", category=UserWarning, module="openpyxl")
 
+
+def _move(args: argparse.Namespace):
+    from modules import move_misplaced_files
+
+    plan = move_misplaced_files(workers=args.workers, dry_run=args.dry_run)
+
+    if args.then_extract:
+        from modules import process_distributors
+
+        # the covers read to plan the moves aren't parsed again during extraction
+        process_distributors(workers=args.workers, covers=plan.covers)
+
+
+def _get_selection(args: argparse.Namespace):
+    if not (args.siglas or args.concession_ids or args.types or args.min_year or args.max_year):
+        return None
+
+    from modules import Selection
+
+    return Selection.create(
+        siglas=args.siglas,
+        concession_ids=args.concession_ids,
+        types=args.types,
+        min_year=args.min_year,
+        max_year=args.max_year
+    )
+
+
+def _extract(args: argparse.Namespace):
+    from modules import process_distributors
+
+    process_distributors(
+        workers=args.workers,
+        sqlite=args.sqlite,
+        resume=args.resume,
+        selection=_get_selection(args)
+    )
+
+
+def _consolidate(args: argparse.Namespace):
+    from modules import process_data_bases
+
+    process_data_bases(columnar_format=args.columnar_format, sqlite=args.sqlite)
+
+
+def _remove_dbs(args: argparse.Namespace):
+    from modules import remove_dbs
+
+    remove_dbs()
+
+
+def _watch(args: argparse.Namespace):
+    from modules import watch
+
+    options = {"workers": args.workers, "use_observer": not args.polling_only}
+
+    if args.poll_seconds is not None:
+        options["poll_seconds"] = args.poll_seconds
+
+    if args.settle_seconds is not None:
+        options["settle_seconds"] = args.settle_seconds
+
+    watch(**options)
+
+
+def _run_all(args: argparse.Namespace):
+    from modules import process_distributors, process_data_bases
+
+    process_distributors(resume=args.resume)
+    process_data_bases()
+
+
+def _get_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Extrai e consolida os bancos de dados das distribuidoras")
+    parser.add_argument("--resume", action="store_true", help="continua uma execução interrompida a partir do diário")
+    parser.set_defaults(command=_run_all)
+
+    subparsers = parser.add_subparsers(title="comandos")
+
+    move_parser = subparsers.add_parser("move", help="move planilhas que estão na pasta da distribuidora errada")
+    move_parser.add_argument("--workers", type=int, default=1)
+    move_options = move_parser.add_mutually_exclusive_group()
+    move_options.add_argument("--simular", dest="dry_run", action="store_true", help="só mostra o que seria movido")
+    move_options.add_argument("--extrair", dest="then_extract", action="store_true", help="depois de mover, gera o banco de dados de cada distribuidora")
+    move_parser.set_defaults(command=_move)
+
+    extract_parser = subparsers.add_parser("extract", help="gera o banco de dados de cada distribuidora")
+    extract_parser.add_argument("--workers", type=int, default=1)
+    # SUPPRESS keeps a --resume given before the subcommand from being reset to False
+    extract_parser.add_argument("--resume", action="store_true", default=argparse.SUPPRESS, help="continua uma execução interrompida a partir do diário")
+    extract_parser.add_argument("--siglas", nargs="+", help="só as distribuidoras com estas siglas")
+    extract_parser.add_argument("--concessoes", dest="concession_ids", nargs="+", help="só as distribuidoras com estes ids de concessão")
+    extract_parser.add_argument("--tipos", dest="types", nargs="+", choices=["Reajuste", "Revisão"], help="só planilhas destes tipos de processo")
+    extract_parser.add_argument("--ano-inicial", dest="min_year", type=int, help="só processos a partir deste ano")
+    extract_parser.add_argument("--ano-final", dest="max_year", type=int, help="só processos até este ano")
+    extract_parser.add_argument("--sqlite", action="store_true", help="também atualiza BANCO.sqlite com as distribuidoras extraídas")
+    extract_parser.set_defaults(command=_extract)
+
+    consolidate_parser = subparsers.add_parser("consolidate", help="junta os bancos das distribuidoras em BANCO.xlsx")
+    consolidate_parser.add_argument("--colunar", dest="columnar_format", choices=["parquet", "arrow"], default=None)
+    consolidate_parser.add_argument("--sqlite", action="store_true")
+    consolidate_parser.set_defaults(command=_consolidate)
+
+    watch_parser = subparsers.add_parser("watch", help="reprocessa as planilhas que chegam em Distribuidoras/")
+    watch_parser.add_argument("--workers", type=int, default=1)
+    watch_parser.add_argument("--intervalo", dest="poll_seconds", type=float, help="segundos entre varreduras da pasta")
+    watch_parser.add_argument("--espera", dest="settle_seconds", type=float, help="segundos sem mudança antes de processar uma planilha")
+    watch_parser.add_argument("--sem-eventos", dest="polling_only", action="store_true", help="só varre a pasta, sem usar o watchdog")
+    watch_parser.set_defaults(command=_watch)
+
+    remove_parser = subparsers.add_parser("remove-dbs", help="apaga os bancos de dados das distribuidoras")
+    remove_parser.set_defaults(command=_remove_dbs)
+
+    return parser
+
+
 if __name__ == "__main__":
-    process_distributors()
-    process_data_bases()
\ No newline at end of file
+    args = _get_parser().parse_args()
+    args.command(args)
@@ -1 +1,22 @@
-from .data import process_distributors, process_data_bases
\ No newline at end of file
+from importlib import import_module
+
+
+# submodules load on first use, so a CLI job only pays for the imports it needs
+_EXPORTS = {
+    "process_distributors": ".data",
+    "process_data_bases": ".data",
+    "move_misplaced_files": ".data",
+    "remove_dbs": ".bank_files",
+    "Selection": ".selection",
+    "watch": ".watcher"
+}
+
+
+def __getattr__(name: str):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    return getattr(import_module(_EXPORTS[name], __name__), name)
+
+
+__all__ = list(_EXPORTS)
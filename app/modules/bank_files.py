@@ -0,0 +1,42 @@
+import os
+
+
+CHUNK_SUFFIX = ".chunk"
+
+
+def get_base_path(base_path: str | None = None) -> str:
+    if base_path is None:
+        base_path = os.path.join(os.path.dirname(__file__), "../../")
+
+    return os.path.abspath(base_path)
+
+
+def remove_dbs(base_path: str | None = None):
+    base_path = get_base_path(base_path)
+
+    distributors_path = os.path.join(base_path, "Distribuidoras")
+
+    distributors = [
+        name for name in os.listdir(distributors_path)
+        if os.path.isdir(os.path.join(distributors_path, name))
+    ]
+
+    distributors.sort()
+
+    for distributor in distributors:
+        distributor_path = os.path.join(distributors_path, distributor)
+        db_path = os.path.join(distributor_path, "Banco de Dados")
+
+        file_names = [
+            name for name in os.listdir(db_path)
+            if (name.endswith(".xlsx") or name.endswith(".xlsm")) 
+            and not name.startswith("~$")
+        ]
+
+        file_names += [name for name in os.listdir(db_path) if name.endswith(CHUNK_SUFFIX)]
+
+        for file_name in file_names:
+            file_path = os.path.join(db_path, file_name)
+            os.remove(file_path)
+
+        os.rmdir(db_path)
@@ -0,0 +1,62 @@
+from openpyxl import Workbook
+from typing import Iterable
+import os
+
+
+MAX_ROW_PER_SHEET = 1048576
+SHEET_TITLE = "BANCO DE DADOS"
+PARTIAL_SUFFIX = ".partial"
+
+
+class BankWriter:
+    def __init__(self, output_name: str, header_rows: Iterable[tuple[any, ...]], max_row_per_sheet: int = MAX_ROW_PER_SHEET):
+        self.output_name = output_name
+        self.header_rows = [tuple(row) for row in header_rows]
+        self.max_row_per_sheet = max_row_per_sheet
+        self.row_count = 0
+
+        self._workbook = Workbook(write_only=True)
+        self._sheet_index = 0
+        self._current_sheet = None
+        self._current_row_count = 0
+
+        self._add_sheet(SHEET_TITLE)
+
+    def _add_sheet(self, title: str):
+        self._current_sheet = self._workbook.create_sheet(title=title)
+
+        for header_row in self.header_rows:
+            self._current_sheet.append(header_row)
+
+        self._current_row_count = len(self.header_rows)
+
+    def append(self, row: Iterable[any]):
+        if self._current_row_count >= self.max_row_per_sheet:
+            self._sheet_index += 1
+            self._add_sheet(f"{SHEET_TITLE} - Ext {self._sheet_index}")
+
+        self._current_sheet.append(row)
+        self._current_row_count += 1
+        self.row_count += 1
+
+    def extend(self, rows: Iterable[Iterable[any]]):
+        for row in rows:
+            self.append(row)
+
+    def save(self):
+        # an interrupted save leaves only the .partial file behind, never a truncated bank
+        partial_name = f"{self.output_name}{PARTIAL_SUFFIX}"
+
+        try:
+            self._workbook.save(partial_name)
+            os.replace(partial_name, self.output_name)
+        finally:
+            if os.path.exists(partial_name):
+                os.remove(partial_name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.save()
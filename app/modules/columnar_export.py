@@ -0,0 +1,164 @@
+from datetime import date, datetime
+from typing import Iterable, Literal
+import json
+
+
+MISSING_VALUES = (None, "-", "NA")
+
+COLUMNAR_SUFFIXES = {
+    "parquet": ".parquet",
+    "arrow": ".arrow"
+}
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError as error:
+        raise ImportError("A exportação colunar precisa do pacote 'pyarrow' (pip install pyarrow)") from error
+
+    return pyarrow
+
+
+def _get_field_names(header_rows: tuple[tuple[any, ...], ...]) -> list[str]:
+    levels = list(zip(*header_rows))
+    level_3_counts = {}
+
+    for level in levels:
+        level_3_counts[level[2]] = level_3_counts.get(level[2], 0) + 1
+
+    field_names = []
+    used_names = set()
+
+    for index, (level_1, level_2, level_3) in enumerate(levels):
+        name = str(level_3) if level_3 is not None else f"coluna {index + 1}"
+
+        if level_3_counts.get(level_3, 0) > 1 and level_2 is not None:
+            name = f"{level_2} - {name}"
+
+        unique_name = name
+        repetition = 1
+
+        while unique_name in used_names:
+            repetition += 1
+            unique_name = f"{name} ({repetition})"
+
+        used_names.add(unique_name)
+        field_names.append(unique_name)
+
+    return field_names
+
+
+def _infer_type(pyarrow, values: list[any]):
+    present = [value for value in values if value not in MISSING_VALUES]
+
+    if not present:
+        return pyarrow.string()
+
+    if all(isinstance(value, bool) for value in present):
+        return pyarrow.bool_()
+
+    if all(isinstance(value, int) and not isinstance(value, bool) for value in present):
+        return pyarrow.int64()
+
+    if all(isinstance(value, (int, float)) and not isinstance(value, bool) for value in present):
+        return pyarrow.float64()
+
+    if all(isinstance(value, datetime) for value in present):
+        return pyarrow.timestamp("us")
+
+    if all(isinstance(value, date) and not isinstance(value, datetime) for value in present):
+        return pyarrow.date32()
+
+    return pyarrow.string()
+
+
+def _to_array(pyarrow, values: list[any], data_type):
+    if pyarrow.types.is_string(data_type):
+        return pyarrow.array(
+            [None if value is None else str(value) for value in values],
+            type=data_type
+        )
+
+    return pyarrow.array(
+        [None if value in MISSING_VALUES else value for value in values],
+        type=data_type
+    )
+
+
+def build_table(header_rows: tuple[tuple[any, ...], ...], rows: Iterable[tuple[any, ...]]):
+    pyarrow = _import_pyarrow()
+
+    header_rows = tuple(tuple(row) for row in header_rows[:3])
+    width = max(len(row) for row in header_rows)
+    header_rows = tuple(row + (None,) * (width - len(row)) for row in header_rows)
+
+    columns = [[] for _ in range(width)]
+
+    for row in rows:
+        for index in range(width):
+            columns[index].append(row[index] if index < len(row) else None)
+
+    fields = []
+    arrays = []
+
+    for index, (name, values) in enumerate(zip(_get_field_names(header_rows), columns)):
+        data_type = _infer_type(pyarrow, values)
+        levels = [header_row[index] for header_row in header_rows]
+
+        fields.append(pyarrow.field(name, data_type, metadata={
+            "levels": json.dumps(levels, ensure_ascii=False)
+        }))
+        arrays.append(_to_array(pyarrow, values, data_type))
+
+    schema = pyarrow.schema(fields, metadata={
+        "header_rows": json.dumps(header_rows, ensure_ascii=False)
+    })
+
+    return pyarrow.Table.from_arrays(arrays, schema=schema)
+
+
+def write_columnar(
+    header_rows: tuple[tuple[any, ...], ...],
+    rows: Iterable[tuple[any, ...]],
+    output_name: str,
+    format: Literal["parquet", "arrow"] = "parquet"
+):
+    pyarrow = _import_pyarrow()
+    table = build_table(header_rows, rows)
+
+    if format == "parquet":
+        pyarrow.parquet.write_table(table, output_name, compression="zstd")
+    elif format == "arrow":
+        with pyarrow.OSFile(output_name, 'wb') as sink:
+            with pyarrow.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+    else:
+        raise ValueError(f"Formato colunar desconhecido: {format}")
+
+
+def read_columnar(file_path: str, columns: list[str] | None = None, multi_index: bool = True):
+    pyarrow = _import_pyarrow()
+
+    if file_path.endswith(COLUMNAR_SUFFIXES["arrow"]):
+        with pyarrow.memory_map(file_path, 'r') as source:
+            table = pyarrow.ipc.open_file(source).read_all()
+
+        if columns is not None:
+            table = table.select(columns)
+    else:
+        table = pyarrow.parquet.read_table(file_path, columns=columns)
+
+    data_frame = table.to_pandas()
+
+    if multi_index:
+        import pandas
+
+        data_frame.columns = pandas.MultiIndex.from_tuples([
+            tuple(json.loads(field.metadata[b"levels"]))
+            for field in table.schema
+        ])
+
+    return data_frame
@@ -1,49 +1,117 @@
 from openpyxl import Workbook
+from dataclasses import dataclass
+from .distributor_info import get_registry
 from .sheet_info import get_value_at_coordinate
+from .sheet_snapshot import SheetRequest, SheetSnapshot, WorkbookSnapshot, is_cell_coordinate, merge_sheet_requests, sheet_request_from_coordinates
+from .xlsx_reader import XlsxArchive
+from .profiling import traced
+from .diagnostics import report
 from .utils import normalize
 from datetime import date
 
 
+PROCESS_DATE_NAME = 'LnkTxtDRPData'
+
+SHEET_REQUESTS = {
+    "CAPA": sheet_request_from_coordinates(['C10', 'C23', 'C27', 'C28', 'M2'])
+}
+
+
+@traced()
+def read_cover_sheet(file_path: str) -> SheetSnapshot:
+    request = SHEET_REQUESTS["CAPA"]
+
+    with XlsxArchive(file_path) as archive:
+        rows, max_row = archive.read_sheet("CAPA", request)
+
+    return SheetSnapshot(title="CAPA", rows=rows, request=request, max_row=max_row)
+
+
+def _get_process_date_destinations(process_date_dn) -> list[tuple[str, str]]:
+    return [
+        (tab_name, cell_ref)
+        for tab_name, cell_ref in process_date_dn.destinations
+        if is_cell_coordinate(cell_ref)
+    ]
+
+
+def get_process_date_requests(workbook: Workbook) -> dict[str, SheetRequest]:
+    process_date_dn = workbook.defined_names.get(PROCESS_DATE_NAME)
+
+    if process_date_dn is None:
+        return {}
+
+    requests = {}
+
+    for tab_name, cell_ref in _get_process_date_destinations(process_date_dn):
+        request = sheet_request_from_coordinates([cell_ref])
+
+        if tab_name in requests:
+            request = requests[tab_name].merge(request)
+
+        requests[tab_name] = request
+
+    return requests
+
+
 def _get_process_date(workbook: Workbook):
     try:
-        process_date_dn = workbook.defined_names['LnkTxtDRPData']
+        process_date_dn = workbook.defined_names[PROCESS_DATE_NAME]
         
-        for tab_name, cell_ref in process_date_dn.destinations:
+        for tab_name, cell_ref in _get_process_date_destinations(process_date_dn):
             tab_origin = workbook[tab_name]
             return tab_origin[cell_ref].value
     except KeyError:
         pass
     except Exception as error:
-        print(f"Unexpected error when reading defined name in {workbook}: {str(error)}")
+        report("defined_name", f"Unexpected error when reading defined name {PROCESS_DATE_NAME}: {str(error)}")
 
     try:
         cover = workbook['CAPA']
         return get_value_at_coordinate('C10', cover)
     except Exception as error:
-        print(f"Could not find process date on {workbook}: {str(error)}")
+        report("process_date", f"Could not find process date: {str(error)}", sheet="CAPA", coordinate="C10")
         return None
     
 
-def get_process_year(workbook: Workbook):
-    process_date = _get_process_date(workbook)
-
+def _get_year(process_date: any):
     if process_date and isinstance(process_date, date):
         return process_date.year
     else:
         return "-"
+
+
+@traced()
+def get_process_year(workbook: Workbook):
+    return _get_year(_get_process_date(workbook))
     
 
+@traced()
+def read_process_year(file_path: str):
+    archive = XlsxArchive(file_path)
+    workbook = WorkbookSnapshot(
+        workbook=archive,
+        requests=merge_sheet_requests(SHEET_REQUESTS, get_process_date_requests(archive))
+    )
+
+    try:
+        return get_process_year(workbook)
+    finally:
+        workbook.close()
+
+
+@traced()
 def get_contract_type(workbook, coordinate: str = 'C27'):
     try:
         cover = workbook['CAPA']
     except Exception as error:
-        print(f"Could not get tab 'CAPA' at {workbook}: {str(error)}")
+        report("missing_tab", f"Could not get tab 'CAPA': {str(error)}", sheet="CAPA")
         return "-"
 
     try:
         contract_type = get_value_at_coordinate(coordinate, cover)
     except Exception as error:
-        print(f"Could not find contract type on {workbook}: {str(error)}")
+        report("contract_type", f"Could not find contract type: {str(error)}", sheet="CAPA", coordinate=coordinate)
         return "-"
     
     if coordinate == 'C27':
@@ -58,4 +126,52 @@ def get_contract_type(workbook, coordinate: str = 'C27'):
     if not contract_type:
         return "-"
     
-    return contract_type
\ No newline at end of file
+    return contract_type
+
+def get_concession_id(cover: any):
+    concession_id = get_value_at_coordinate('C23', cover)
+
+    if not concession_id:
+        concession_id = get_value_at_coordinate('M2', cover)
+
+    return concession_id
+
+
+def get_distributor_contract_type(distributor: str) -> str:
+    distributor_contract_type = get_registry().get_column_info(
+        unknown_column_name="CONTRATO",
+        known_column_name="SIGLA",
+        known_value=distributor
+    )
+
+    if not distributor_contract_type or not isinstance(distributor_contract_type, str):
+        return ""
+
+    return distributor_contract_type
+
+
+@dataclass(frozen=True)
+class WorkbookMetadata:
+    process_date: any
+    process_year: int | str
+    contract_type: any
+    concession_id: any
+    distributor_contract_type: str
+
+
+@traced()
+def get_workbook_metadata(workbook: Workbook, distributor: str) -> WorkbookMetadata:
+    process_date = _get_process_date(workbook)
+
+    try:
+        concession_id = get_concession_id(workbook['CAPA'])
+    except Exception:
+        concession_id = None
+
+    return WorkbookMetadata(
+        process_date=process_date,
+        process_year=_get_year(process_date),
+        contract_type=get_contract_type(workbook),
+        concession_id=concession_id,
+        distributor_contract_type=get_distributor_contract_type(distributor)
+    )
@@ -1,20 +1,85 @@
 from openpyxl import load_workbook
 from openpyxl import Workbook
-from openpyxl.worksheet.worksheet import Worksheet
 import os
 from tqdm import tqdm
 import shutil
-from typing import Literal
-from .utils import get_suffix, get_json_data
-from .sheet_info import get_tab, get_value_at_coordinate
-from .distributor_info import get_distributor_info, get_column_info
-from .cover_info import get_process_year, get_contract_type
-from .specific_info import get_specific_info, get_real_OM_headers
+import errno
+from concurrent.futures import Executor
+from functools import partial
+from typing import Iterable, Iterator, Literal, NamedTuple
+from .utils import get_suffix
+from .bank_writer import BankWriter, PARTIAL_SUFFIX
+from .bank_files import get_base_path, remove_dbs
+from .row_sets import RowSet, get_year_sort_key, merge_row_sets
+from .manifest import Manifest, get_config_hashes
+from .columnar_export import COLUMNAR_SUFFIXES, write_columnar
+from .sqlite_sink import SQLITE_NAME, SQLiteSink
+from .extraction_plan import ExtractionPlan, get_OM_plan, get_extraction_plan
+from .sheet_info import get_value_at_coordinate
+from .distributor_info import get_distributor_info, get_registry
+from .sheet_snapshot import WorkbookSnapshot, SheetRequest, SheetSnapshot, merge_sheet_requests, sheet_requests_from_cells
+from .xlsx_reader import XlsxArchive
+from .row_chunks import RowChunk, UnsupportedValueError, get_chunk_path, write_chunk
+from .diagnostics import COVER_REPORT_NAME, Diagnostic, collect, extend, read_report, report, stage
+from .profiling import FILE_SPAN, count, get_profile_paths, is_profiling_requested, merge, record, span
+from .cover_info import WorkbookMetadata, get_concession_id, get_process_date_requests, get_workbook_metadata, read_cover_sheet, read_process_year, SHEET_REQUESTS as COVER_SHEET_REQUESTS
+from .selection import Selection
+from .specific_info import get_specific_info, get_real_OM_headers, SHEET_REQUESTS as SPECIFIC_SHEET_REQUESTS
 
 
-def move_misplaced_files():
-    base_path = os.path.join(os.path.dirname(__file__), "../../")
-    base_path = os.path.abspath(base_path)
+TEMP_SUFFIX = "_temp"
+TEMP_FOLDER = "Temporários"
+
+
+def _get_executor(workers: int):
+    if workers <= 1:
+        return None
+
+    # the process pool is slow to import, so single-worker runs never load it
+    from concurrent.futures import ProcessPoolExecutor
+
+    return ProcessPoolExecutor(max_workers=workers)
+
+
+class FileMove(NamedTuple):
+    source: str
+    destination: str
+    action: Literal["move", "remove"]
+
+
+class CoverResult(NamedTuple):
+    job: "FileJob"
+    stat_key: tuple[int, int] | None
+    cover: SheetSnapshot | None
+    error: str | None
+
+
+class MovePlan(NamedTuple):
+    moves: list[FileMove]
+    covers: dict[str, tuple[tuple[int, int], SheetSnapshot]]
+
+
+def _get_stat_key(file_path: str) -> tuple[int, int]:
+    stat = os.stat(file_path)
+    return (stat.st_size, stat.st_mtime_ns)
+
+
+def _read_cover(job: "FileJob") -> CoverResult:
+    try:
+        stat_key = _get_stat_key(job.file_path)
+        cover = read_cover_sheet(job.file_path)
+    except FileNotFoundError:
+        return CoverResult(job=job, stat_key=None, cover=None, error=f"Planilha {job.file_path} não encontrada")
+    except KeyError:
+        return CoverResult(job=job, stat_key=None, cover=None, error=f"Erro: A aba CAPA não foi encontrada em {job.file_path}.")
+    except Exception as error:
+        return CoverResult(job=job, stat_key=None, cover=None, error=f"Falha ao ler a capa de {job.file_path}: {str(error)}")
+
+    return CoverResult(job=job, stat_key=stat_key, cover=cover, error=None)
+
+
+def plan_misplaced_files(workers: int = 1, base_path: str | None = None) -> MovePlan:
+    base_path = get_base_path(base_path)
 
     distributors_path = os.path.join(base_path, "Distribuidoras")
 
@@ -23,386 +88,453 @@ def move_misplaced_files():
         if os.path.isdir(os.path.join(distributors_path, name))
     ]
 
-    for distributor in tqdm(distributors, desc="Processando distribuidoras..."):
-        distributor_path = os.path.join(distributors_path, distributor)
+    distributors.sort()
 
-        for type in ["Reajuste", "Revisão"]:
-            type_path = os.path.join(distributor_path, type)
+    jobs = _get_file_jobs(distributors_path, distributors)
+    registry = get_registry()
 
-            file_names = [
-                name for name in os.listdir(type_path)
-                if (name.endswith(".xlsx") or name.endswith(".xlsm")) 
-                and not name.startswith("~$")
-            ]
+    moves = []
+    covers = {}
+    destinations = set()
+
+    with collect() as collector, stage("covers"):
+        executor = _get_executor(workers)
+
+        try:
+            if executor:
+                results = executor.map(_read_cover, jobs, chunksize=4)
+            else:
+                results = map(_read_cover, jobs)
+
+            for result in tqdm(results, total=len(jobs), desc="Verificando capas..."):
+                job = result.job
+
+                if result.error is not None:
+                    report("cover_read", result.error, sheet="CAPA", file=job.file_path)
+                    continue
 
-            for file_name in tqdm(file_names, desc=f"{distributor} - {type}", leave=False):
-                file_path = os.path.join(type_path, file_name)
+                covers[job.file_path] = (result.stat_key, result.cover)
 
-                try:
-                    workbook = load_workbook(file_path, keep_links=False, read_only=True, data_only=True)
-                except FileNotFoundError:
-                    print(f"Planilha {file_path} não encontrada")
+                file_concession_id = get_concession_id(result.cover)
+
+                if not file_concession_id:
+                    report("concession_id", f"Planilha {job.file_path} com id_concessao não encontrada", sheet="CAPA", coordinate="C23", file=job.file_path)
                     continue
 
-                cover = get_tab("CAPA", workbook)
+                aimed_concession_id = registry.get_column_info(
+                    unknown_column_name="ID CONCESSÃO",
+                    known_column_name="SIGLA",
+                    known_value=job.distributor
+                )
 
-                if cover:
-                    file_concession_id = get_value_at_coordinate('C23', cover)
+                if file_concession_id == aimed_concession_id:
+                    continue
 
-                    if not file_concession_id:
-                        file_concession_id = get_value_at_coordinate('M2', cover)
+                tqdm.write(f"Planilha {job.file_path} deveria ter id_concessao {aimed_concession_id}, mas tem id_concessao {file_concession_id}")
 
-                        if not file_concession_id:
-                            print(f"Planilha {file_path} com id_concessao não encontrada")
-                            continue
+                right_distributor = registry.get_column_info(
+                    unknown_column_name="SIGLA",
+                    known_column_name="ID CONCESSÃO",
+                    known_value=file_concession_id
+                )
 
-                    aimed_concession_id = get_column_info(
-                        unknown_column_name="ID CONCESSÃO",
-                        known_column_name="SIGLA",
-                        known_value=distributor
-                    )
+                if not right_distributor:
+                    report("unknown_concession_id", f"Nenhuma distribuidora com id_concessao {file_concession_id}. Mantendo {job.file_path}", file=job.file_path)
+                    continue
 
-                    if file_concession_id != aimed_concession_id:
-                        print(f"Planilha {file_path} deveria ter id_concessao {aimed_concession_id}, mas tem id_concessao {file_concession_id}")
+                right_distributor_path = os.path.join(
+                    distributors_path, right_distributor, job.type, os.path.basename(job.file_path)
+                )
 
-                        right_distributor = get_column_info(
-                            unknown_column_name="SIGLA",
-                            known_column_name="ID CONCESSÃO",
-                            known_value=file_concession_id
-                        )
+                if os.path.exists(right_distributor_path) or right_distributor_path in destinations:
+                    action = "remove"
+                else:
+                    action = "move"
+                    destinations.add(right_distributor_path)
 
-                        right_distributor_path = os.path.join(distributors_path, right_distributor, type, file_name)
+                moves.append(FileMove(source=job.file_path, destination=right_distributor_path, action=action))
+        finally:
+            if executor:
+                executor.shutdown(cancel_futures=True)
 
-                        if os.path.exists(right_distributor_path):
-                            print(f"O caminho {right_distributor_path} já existe. Removendo {file_path}")
+    report_path = collector.write(base_path, COVER_REPORT_NAME)
 
-                            os.remove(file_path)
-                            continue
+    if report_path:
+        print(f"\n{collector.summary()}. Relatório salvo em {report_path}")
 
-                        print(f"Movendo para {right_distributor_path}")
+    return MovePlan(moves=moves, covers=covers)
 
-                        shutil.move(file_path, right_distributor_path)
 
+def _rename_file(source: str, destination: str):
+    try:
+        os.rename(source, destination)
+    except OSError as error:
+        if error.errno != errno.EXDEV:
+            raise
 
-def _get_fixed_tab(workbook: Workbook, distributor: str, type: Literal["Reajuste", "Revisão"]) -> Worksheet:
-    distributor_info = get_distributor_info(distributor)
+        shutil.move(source, destination)
 
-    process_year = get_process_year(workbook)
-    distributor_info["Ano"] = process_year
 
-    contract_type = get_contract_type(workbook)
-    distributor_info["Contrato"] = contract_type
+def apply_move_plan(plan: MovePlan, dry_run: bool = False) -> MovePlan:
+    missing_sources = [move.source for move in plan.moves if not os.path.exists(move.source)]
 
-    distributor_info["Tipo de Processo"] = type
+    if missing_sources:
+        raise FileNotFoundError(f"Planilhas não encontradas ao aplicar o plano: {', '.join(missing_sources)}")
 
-    distributor_header = list(distributor_info.keys())
-    distributor_values = list(distributor_info.values())
+    for move in plan.moves:
+        if move.action == "remove":
+            print(f"O caminho {move.destination} já existe. Removendo {move.source}")
+        else:
+            print(f"Movendo {move.source} para {move.destination}")
 
-    new_workbook = Workbook()
-    new_tab = new_workbook.active
+    if dry_run:
+        return plan
 
-    new_tab.insert_rows(0)
-    new_tab.insert_rows(0)
+    # removals are staged as renames too, so a failure partway puts every file back where it was
+    staged_paths = [
+        move.destination if move.action == "move" else f"{move.source}{PARTIAL_SUFFIX}"
+        for move in plan.moves
+    ]
+    applied_moves = []
 
-    new_tab.append(distributor_header)
-    new_tab.append(distributor_values)
+    try:
+        for move, staged_path in zip(plan.moves, staged_paths):
+            os.makedirs(os.path.dirname(staged_path), exist_ok=True)
+            _rename_file(move.source, staged_path)
+            applied_moves.append((move.source, staged_path))
+    except BaseException:
+        for source, staged_path in reversed(applied_moves):
+            _rename_file(staged_path, source)
 
-    return new_tab
+        raise
 
+    covers = dict(plan.covers)
 
-def _get_changing_tab(
-    distributor: str, 
-    workbook: Workbook, 
-    type: Literal["Reajuste", "Revisão"]
-) -> Worksheet:
-    new_workbook = Workbook()
-    new_tab = new_workbook.active
+    for move, staged_path in zip(plan.moves, staged_paths):
+        cover = covers.pop(move.source, None)
 
-    json_path = os.path.join(os.path.dirname(__file__), "details.json")
-    json_data = get_json_data(json_path)
+        if move.action == "remove":
+            os.remove(staged_path)
+        elif cover is not None:
+            covers[move.destination] = cover
 
-    headers = json_data['headers']
+    return MovePlan(moves=plan.moves, covers=covers)
 
-    useful_header = None
 
-    for header in headers:
-        all_items = []
-        repeats = header['repeats']
-        items = header['items']
-        
-        if repeats:
-            all_repetitions = header['repetitions']
+def move_misplaced_files(workers: int = 1, dry_run: bool = False, base_path: str | None = None) -> MovePlan:
+    plan = plan_misplaced_files(workers=workers, base_path=base_path)
+    return apply_move_plan(plan, dry_run=dry_run)
 
-            for index in range(len(items)):
-                repetitions = all_repetitions[index]
-                item = items[index]
 
-                for _ in range(repetitions):
-                    all_items.append(item)
-        else:
-            useful_header = header
+def _get_sheet_requests(plan: ExtractionPlan) -> dict[str, SheetRequest]:
+    return merge_sheet_requests(
+        sheet_requests_from_cells(plan.cells_by_tab),
+        COVER_SHEET_REQUESTS,
+        SPECIFIC_SHEET_REQUESTS
+    )
+
+
+def _get_fixed_rows(
+    distributor: str,
+    plan: ExtractionPlan,
+    type: Literal["Reajuste", "Revisão"],
+    metadata: WorkbookMetadata
+) -> list[list[any]]:
+    distributor_info = get_distributor_info(distributor)
+    distributor_info["Ano"] = metadata.process_year
+    distributor_info["Contrato"] = metadata.contract_type
+    distributor_info["Tipo de Processo"] = type
 
-            for item in items:
-                all_items.append(item)
+    return [
+        [],
+        [],
+        list(plan.fixed_columns),
+        [distributor_info[column] for column in plan.fixed_columns]
+    ]
 
-        new_tab.append(all_items)
 
+def _get_changing_rows(
+    distributor: str,
+    workbook: Workbook,
+    plan: ExtractionPlan,
+    type: Literal["Reajuste", "Revisão"],
+    metadata: WorkbookMetadata
+) -> list[list[any]]:
     changing_values = _get_changing_values(
         distributor=distributor,
         workbook=workbook,
-        header=useful_header,
-        type=type
+        plan=plan,
+        type=type,
+        metadata=metadata
     )
 
-    new_tab.append(changing_values)
-
-    return new_tab
+    return [list(header_row) for header_row in plan.header_rows] + [changing_values]
 
 
 def _get_changing_values(
     distributor: str,
     workbook: Workbook, 
-    header: any, 
-    type: Literal["Reajuste", "Revisão"]
+    plan: ExtractionPlan, 
+    type: Literal["Reajuste", "Revisão"],
+    metadata: WorkbookMetadata
 ) -> list[any]:
-    tabs = header['tabs']
-    coordinates = header['coordinates']
     all_values = []
 
-    for tab_index in range(len(tabs)):
-        if 0 <= tab_index < 81:
-            if type == "Reajuste":
-                all_values.append("-")
-                continue
-
-        tab_name = tabs[tab_index]
-
-        if tab_name == "":
-            specific_tabs_indexes = [81, 82, 83, 84, 85, 86, 96]
-
-            if tab_index in specific_tabs_indexes:
-                distributor_contract_type = get_column_info(
-                    unknown_column_name="CONTRATO",
-                    known_column_name="SIGLA",
-                    known_value=distributor
-                )
+    for step in plan.steps:
+        if type == "Reajuste" and step.index in plan.reajuste_skip_range:
+            all_values.append("-")
+            continue
 
-                if not distributor_contract_type or not isinstance(distributor_contract_type, str):
-                    distributor_contract_type = ""
+        if step.kind == "specific":
+            value = get_specific_info(
+                workbook=workbook,
+                contract_type=metadata.distributor_contract_type,
+                type=type,
+                process_year=metadata.process_year,
+                tab_index=step.index
+            )
 
-                process_year = get_process_year(workbook)
+            if not value:
+                value = "-"
 
-                value = get_specific_info(
-                    workbook=workbook,
-                    contract_type=distributor_contract_type,
-                    type=type,
-                    process_year=process_year,
-                    tab_index=tab_index
-                )
-
-                if not value:
-                    value = "-"
+            all_values.append(value)
+            continue
 
-                all_values.append(value)
-                continue
-            else:
-                all_values.append("NA")
-                continue
+        if step.kind == "na":
+            all_values.append("NA")
+            continue
 
         try:
-            tab = workbook[tab_name]
+            tab = workbook[step.tab_name]
         except Exception as error:
-            print(f"Could not find {tab_name} on {workbook}: {str(error)}")
-            continue
+            report("missing_tab", f"Could not find {step.tab_name}: {str(error)}", sheet=step.tab_name, coordinate=",".join(step.coordinates))
 
-        coordinate = coordinates[tab_index]
+            # the placeholder keeps every later value in its own column
+            all_values.append(None)
+            continue
 
-        if isinstance(coordinate, str) and coordinate.startswith("ADD"):
-            parts = coordinate.split("-")
-            codes = parts[1:]
+        if step.kind == "add":
             value = 0
 
-            for code in codes:
+            for code in step.coordinates:
                 code_value = get_value_at_coordinate(code, tab)
 
                 if isinstance(code_value, (float, int)):
                     value += code_value
         else:
-            value = get_value_at_coordinate(coordinate, tab)
+            value = get_value_at_coordinate(step.coordinates[0], tab)
 
         all_values.append(value)
 
     return all_values
 
 
-def _get_other_changing_tab(workbook: Workbook, type: Literal["Reajuste", "Revisão"]):
-    json_path = os.path.join(os.path.dirname(__file__), "real_OM_info.json")
-    json_data = get_json_data(json_path)
-
-    real_OM_headers = get_real_OM_headers(
+def _get_other_changing_rows(workbook: Workbook, type: Literal["Reajuste", "Revisão"]) -> list[list[any]]:
+    return get_real_OM_headers(
         workbook=workbook,
-        json_data=json_data,
+        OM_plan=get_OM_plan(),
         type=type
     )
 
-    new_workbook = Workbook()
-    new_tab = new_workbook.active
 
-    new_tab.append(real_OM_headers[0])
-    new_tab.append(real_OM_headers[1])
-    new_tab.append(real_OM_headers[2])
-    new_tab.append(real_OM_headers[3])
+def _assemble_rows(blocks: list[tuple[list[list[any]], int]]) -> tuple[tuple[any, ...], ...]:
+    row_count = max(len(block_rows) for block_rows, _ in blocks)
+    rows = [[] for _ in range(row_count)]
 
-    return new_tab
+    for block_rows, width in blocks:
+        for row_index, row in enumerate(rows):
+            block_row = block_rows[row_index] if row_index < len(block_rows) else []
+            row.extend(block_row[:width])
+            row.extend([None] * (width - len(block_row)))
 
+    return tuple(tuple(row) for row in rows)
 
-def _filtered_workbook(
+
+def _extract_rows(
         workbook: Workbook, 
         distributor: str, 
         type: Literal["Reajuste", "Revisão"]
-) -> Workbook:
-    fixed_tab = _get_fixed_tab(
-        workbook=workbook,
-        distributor=distributor,
-        type=type
-    )
+) -> tuple[tuple[any, ...], ...]:
+    plan = get_extraction_plan()
+
+    with span("metadata"), stage("metadata"):
+        metadata = get_workbook_metadata(workbook, distributor)
+
+    with span("fixed"), stage("fixed"):
+        fixed_rows = _get_fixed_rows(
+            distributor=distributor,
+            plan=plan,
+            type=type,
+            metadata=metadata
+        )
 
-    changing_tab = _get_changing_tab(
-        distributor=distributor,
-        workbook=workbook,
-        type=type
-    )
+    with span("changing"), stage("changing"):
+        changing_rows = _get_changing_rows(
+            distributor=distributor,
+            workbook=workbook,
+            plan=plan,
+            type=type,
+            metadata=metadata
+        )
 
-    start_column = 9
+    with span("om"), stage("om"):
+        other_changing_rows = _get_other_changing_rows(
+            workbook=workbook,
+            type=type
+        )
 
-    for row in changing_tab.iter_rows(
-        min_row=1, 
-        max_row=changing_tab.max_row, 
-        min_col=1, 
-        max_col=changing_tab.max_column
-    ):
-        for cell in row:
-            new_column = cell.column + start_column
-            fixed_tab.cell(row=cell.row, column=new_column).value = cell.value
+    with span("assemble"):
+        return _assemble_rows([
+            (fixed_rows, len(plan.fixed_columns)),
+            (changing_rows, plan.width),
+            (other_changing_rows, max(len(row) for row in other_changing_rows))
+        ])
 
-    other_changing_tab = _get_other_changing_tab(
-        workbook=workbook,
-        type=type
-    )
 
-    start_column += 103
+def _iter_db_rows(file_path: str, min_row: int = 1, max_row: int | None = None) -> Iterator[tuple[any, ...]]:
+    workbook = load_workbook(file_path, keep_links=False, read_only=True, data_only=True)
 
-    for row in other_changing_tab.iter_rows(
-        min_row=1,
-        max_row=other_changing_tab.max_row,
-        min_col=1,
-        max_col=other_changing_tab.max_column
-    ):
-        for cell in row:
-            new_column = cell.column + start_column
-            fixed_tab.cell(row=cell.row, column=new_column).value = cell.value
+    try:
+        yield from workbook.active.iter_rows(min_row=min_row, max_row=max_row, values_only=True)
+    finally:
+        workbook.close()
 
-    new_workbook = Workbook()
-    new_tab = new_workbook.active
-    new_tab.title = "BANCO DE DADOS"
 
-    for row in fixed_tab.iter_rows(
-        min_row=1,
-        max_row=fixed_tab.max_row,
-        min_col=1,
-        max_col=fixed_tab.max_column
-    ):
-        for cell in row:
-            new_tab.cell(row=cell.row, column=cell.column).value = cell.value
+def _mix_rows(header_rows: tuple[tuple[any, ...], ...], rows: Iterable[tuple[any, ...]], output_name: str):
+    with span("bank_save", output=os.path.basename(output_name)):
+        with BankWriter(output_name=output_name, header_rows=header_rows) as writer:
+            writer.extend(rows)
 
-    return new_workbook
 
+class FileJob(NamedTuple):
+    distributor: str
+    type: Literal["Reajuste", "Revisão"]
+    file_path: str
+    cover: SheetSnapshot | None = None
 
-def _add_header_rows(header_rows: list[any], to_sheet: Worksheet):
-    worksheet = to_sheet
 
-    for row_offset, row in enumerate(header_rows, start=1):
-        for column_offset, cell in enumerate(row, start=1):
-            target_row = row_offset
-            target_column = column_offset
+class FileResult(NamedTuple):
+    job: FileJob
+    row_set: RowSet | None
+    error: str | None
+    trace: dict | None = None
+    diagnostics: list[list[any]] | None = None
 
-            value = getattr(cell, "value", None)
-            worksheet.cell(row=target_row, column=target_column).value = value
 
+def _open_workbook(file_path: str, backend: Literal["xlsx", "openpyxl"]):
+    if backend == "xlsx":
+        return XlsxArchive(file_path)
 
-def _sorted_workbooks(workbooks: list[Workbook]) -> list[Workbook]:
-    return sorted(
-        workbooks,
-        key=lambda workbook: workbook.active['G4'].value
-    )
+    if backend == "openpyxl":
+        count("bytes_read", os.path.getsize(file_path))
+        return load_workbook(file_path, keep_links=False, read_only=True, data_only=True)
 
+    raise ValueError(f"Backend de leitura desconhecido: {backend}")
 
-def _mix_db_files(file_paths: list[str], output_name: str, sort_workbooks: bool = True):
-    if not file_paths:
-        print(f"Lista de caminhos de arquivos vazia (iria para {output_name})")
-        return
-    
-    file_workbooks = [
-        load_workbook(file_path, keep_links=False, read_only=True, data_only=True)
-        for file_path in file_paths
-    ]
 
-    if sort_workbooks:
-        file_workbooks = _sorted_workbooks(file_workbooks)
+def _extract_file(
+    job: FileJob,
+    backend: Literal["xlsx", "openpyxl"] = "xlsx",
+    profile: bool = False
+) -> FileResult:
+    with collect(file=job.file_path) as collector, record(enabled=profile, file=job.file_path) as recorder:
+        with span(FILE_SPAN, distributor=job.distributor, type=job.type):
+            result = _extract_file_rows(job, backend)
 
-    max_row_per_sheet = 1048576
+    result = result._replace(diagnostics=collector.export())
 
-    output_workbook = Workbook()
-    output_worksheet = output_workbook.active
-    output_worksheet.title = "BANCO DE DADOS"
+    if recorder is None:
+        return result
 
-    current_sheet = output_worksheet
-    current_row_count = 3
-    sheet_index = 0
+    return result._replace(trace=recorder.export())
+
+
+def _extract_file_rows(job: FileJob, backend: Literal["xlsx", "openpyxl"]) -> FileResult:
+    plan = get_extraction_plan()
+
+    try:
+        with span("open", backend=backend):
+            workbook = _open_workbook(job.file_path, backend)
+
+            file_workbook = WorkbookSnapshot(
+                workbook=workbook,
+                requests=merge_sheet_requests(_get_sheet_requests(plan), get_process_date_requests(workbook)),
+                sheets={"CAPA": job.cover} if job.cover else None
+            )
+
+        try:
+            rows = _extract_rows(
+                workbook=file_workbook,
+                distributor=job.distributor,
+                type=job.type
+            )
+        finally:
+            file_workbook.close()
 
-    header_rows = [] 
+        year = rows[3][plan.fixed_columns.index("Ano")]
+        row_set = RowSet(sort_key=get_year_sort_key(year), rows=rows)
 
-    for file_index, file_workbook in enumerate(file_workbooks):
-        file_worksheet = file_workbook.active
+        return FileResult(job=job, row_set=row_set, error=None)
+    except Exception as error:
+        return FileResult(job=job, row_set=None, error=str(error))
 
-        if file_index == 0:
-            header_rows = list(file_worksheet.iter_rows(min_row=1, max_row=3, values_only=False))
-            _add_header_rows(header_rows, to_sheet=current_sheet)
 
-        min_row = 4
-        max_row = file_worksheet.max_row
+def _save_rows(row_set: RowSet, output_name: str):
+    _mix_rows(row_set.header_rows, row_set.value_rows, output_name)
 
-        for row in file_worksheet.iter_rows(min_row=min_row, max_row=max_row, values_only=True):
-            if current_row_count >= max_row_per_sheet:
-                sheet_index += 1
-                new_sheet_title = f"BANCO DE DADOS - Ext {sheet_index}"
-                current_sheet = output_workbook.create_sheet(title=new_sheet_title)
-                _add_header_rows(header_rows, to_sheet=current_sheet)
-                current_row_count = 3
 
-            current_sheet.append(row)
-            current_row_count += 1
+def _get_temp_path(distributors_path: str, job: FileJob) -> str:
+    # debug copies go in their own folder so they're never taken for source workbooks
+    file_name = os.path.basename(job.file_path)
+    file_suffix = get_suffix(file_name)
+    temp_folder_path = os.path.join(distributors_path, job.distributor, TEMP_FOLDER, job.type)
+    os.makedirs(temp_folder_path, exist_ok=True)
 
-    output_workbook.save(output_name)
+    return os.path.join(temp_folder_path, f"{file_name[:-len(file_suffix)]}{TEMP_SUFFIX}{file_suffix}")
 
 
-def process_distributors():
-    base_path = os.path.join(os.path.dirname(__file__), "../../")
-    base_path = os.path.abspath(base_path)
+def _is_temp_file(file_name: str) -> bool:
+    stem, suffix = os.path.splitext(file_name)
+    return stem.endswith(TEMP_SUFFIX) and suffix in (".xlsx", ".xlsm")
 
+
+def _remove_temp_files(distributors_path: str):
+    for distributor in os.listdir(distributors_path):
+        temp_folder_path = os.path.join(distributors_path, distributor, TEMP_FOLDER)
+
+        if not os.path.isdir(temp_folder_path):
+            continue
+
+        for directory, _, file_names in os.walk(temp_folder_path, topdown=False):
+            for file_name in file_names:
+                if _is_temp_file(file_name):
+                    os.remove(os.path.join(directory, file_name))
+
+            if not os.listdir(directory):
+                os.rmdir(directory)
+
+
+def _remove_interrupted_files(base_path: str, keep_temp_files: bool):
     distributors_path = os.path.join(base_path, "Distribuidoras")
 
-    distributors = [
-        name for name in os.listdir(distributors_path)
-        if os.path.isdir(os.path.join(distributors_path, name))
-    ]
+    for directory, _, file_names in os.walk(distributors_path):
+        for file_name in file_names:
+            if file_name.endswith(PARTIAL_SUFFIX):
+                os.remove(os.path.join(directory, file_name))
 
-    distributors.sort()
+    if not keep_temp_files:
+        _remove_temp_files(distributors_path)
 
-    for distributor in tqdm(distributors, desc="Processando distribuidoras..."):
-        distributor_path = os.path.join(distributors_path, distributor)
+    for file_name in os.listdir(base_path):
+        if file_name.endswith(PARTIAL_SUFFIX):
+            os.remove(os.path.join(base_path, file_name))
 
-        temp_file_paths = []
+
+def _get_file_jobs(distributors_path: str, distributors: list[str]) -> list[FileJob]:
+    jobs = []
+
+    for distributor in distributors:
+        distributor_path = os.path.join(distributors_path, distributor)
 
         for type in ["Reajuste", "Revisão"]:
             type_path = os.path.join(distributor_path, type)
@@ -413,54 +545,391 @@ def process_distributors():
                 and not name.startswith("~$")
             ]
 
-            for file_name in tqdm(file_names, desc=f"{distributor} - {type}", leave=False):
-                file_path = os.path.join(type_path, file_name)
-                file_workbook = load_workbook(file_path, keep_links=False, read_only=True, data_only=True)
-
-                try:
-                    new_workbook = _filtered_workbook(
-                        workbook=file_workbook,
-                        distributor=distributor,
-                        type=type
-                    )
-
-                    file_suffix = get_suffix(file_name)
-                    temp_path = file_path.replace(file_suffix, f"_temp{file_suffix}")
-                    new_workbook.save(temp_path)    
-                    temp_file_paths.append(temp_path)   
-                except Exception as error:
-                    print(f"\nFalha ao filtrar planilha em {file_path}: {str(error)}")    
-
-        if temp_file_paths:
-            output_folder_path = os.path.join(distributor_path, "Banco de Dados")
-            os.makedirs(output_folder_path, exist_ok=True)   
-
-            output_path = os.path.join(output_folder_path, f"{distributor}_BANCO.xlsx")
-
-            _mix_db_files(
-                file_paths=temp_file_paths,
-                output_name=output_path
-            )
+            for file_name in file_names:
+                jobs.append(FileJob(
+                    distributor=distributor,
+                    type=type,
+                    file_path=os.path.join(type_path, file_name)
+                ))
+
+    return jobs
+
+
+def _attach_cover(job: FileJob, covers: dict[str, tuple[tuple[int, int], SheetSnapshot]]) -> FileJob:
+    entry = covers.get(job.file_path)
+
+    if entry is None:
+        return job
+
+    stat_key, cover = entry
+
+    if stat_key != _get_stat_key(job.file_path):
+        return job
+
+    return job._replace(cover=cover)
+
+
+def _read_job_year(job: FileJob) -> tuple[FileJob, any]:
+    try:
+        return job, read_process_year(job.file_path)
+    except Exception:
+        # unreadable files stay selected so the extraction reports what's wrong with them
+        return job, None
+
+
+def _select_jobs(jobs: list[FileJob], selection: Selection, workers: int) -> tuple[list[FileJob], list[FileJob]]:
+    selected_jobs = []
+    skipped_jobs = []
+
+    jobs_to_read = []
 
-            print(f"\nBanco de dados consolidado em {output_path}")
+    for job in jobs:
+        if not selection.includes_type(job.type):
+            skipped_jobs.append(job)
+        elif selection.has_year_range:
+            jobs_to_read.append(job)
+        else:
+            selected_jobs.append(job)
+
+    if not jobs_to_read:
+        return selected_jobs, skipped_jobs
+
+    executor = _get_executor(workers)
+
+    try:
+        if executor:
+            results = executor.map(_read_job_year, jobs_to_read, chunksize=4)
+        else:
+            results = map(_read_job_year, jobs_to_read)
+
+        for job, year in tqdm(results, total=len(jobs_to_read), desc="Lendo anos dos processos..."):
+            if year is None or selection.includes_year(year):
+                selected_jobs.append(job)
+            else:
+                skipped_jobs.append(job)
+    finally:
+        if executor:
+            executor.shutdown()
+
+    return selected_jobs, skipped_jobs
+
+
+def _get_bank_path(distributor_path: str, distributor: str) -> str:
+    return os.path.join(distributor_path, "Banco de Dados", f"{distributor}_BANCO.xlsx")
+
+
+def _save_chunk(bank_path: str, header_rows: tuple[tuple[any, ...], ...], rows: list[tuple[any, ...]]):
+    chunk_path = get_chunk_path(bank_path)
+
+    with span("chunk_save", output=os.path.basename(chunk_path)):
+        try:
+            write_chunk(chunk_path, bank_path, header_rows, rows)
+        except UnsupportedValueError:
+            # the global bank falls back to reading this distributor's xlsx
+            if os.path.exists(chunk_path):
+                os.remove(chunk_path)
+
+
+def _iter_bank_rows(file_path: str) -> tuple[tuple[tuple[any, ...], ...], Iterator[tuple[any, ...]]]:
+    chunk = RowChunk.open(get_chunk_path(file_path), file_path)
+
+    if chunk is not None:
+        return chunk.header_rows, chunk.iter_rows()
+
+    return tuple(_iter_db_rows(file_path, max_row=3)), _iter_db_rows(file_path, min_row=4)
+
+
+def _remove_bank(bank_path: str):
+    if not os.path.exists(bank_path):
+        return
+
+    # a distributor whose workbooks were all deleted must not leave its rows in the global bank
+    for file_path in (bank_path, get_chunk_path(bank_path)):
+        if os.path.exists(file_path):
+            os.remove(file_path)
+
+    db_path = os.path.dirname(bank_path)
+
+    if not os.listdir(db_path):
+        os.rmdir(db_path)
+
+    tqdm.write(f"\nBanco de dados removido: {bank_path}")
+
+
+def _consolidate_distributor(
+    distributor_path: str,
+    distributor: str,
+    row_sets: list[RowSet]
+):
+    output_path = _get_bank_path(distributor_path, distributor)
+
+    if not row_sets:
+        _remove_bank(output_path)
+        return
+
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)   
+
+    rows = list(merge_row_sets(row_sets))
+
+    _mix_rows(
+        header_rows=row_sets[0].header_rows,
+        rows=rows,
+        output_name=output_path
+    )
 
-            for temp_file in temp_file_paths:
-                os.remove(temp_file)
+    _save_chunk(output_path, row_sets[0].header_rows, rows)
 
+    tqdm.write(f"\nBanco de dados consolidado em {output_path}")
 
-def process_data_bases():
-    base_path = os.path.join(os.path.dirname(__file__), "../../")
-    base_path = os.path.abspath(base_path)
 
+def _get_unselected_diagnostics(base_path: str, selection: Selection) -> list[Diagnostic]:
+    distributors_path = os.path.join(base_path, "Distribuidoras")
+    diagnostics = []
+
+    # failures without a file can't be told apart, so the run reports them again if they still happen
+    for diagnostic in read_report(base_path):
+        if diagnostic.file is None:
+            continue
+
+        distributor = os.path.relpath(diagnostic.file, distributors_path).split(os.sep)[0]
+
+        if not selection.includes_distributor(distributor):
+            diagnostics.append(diagnostic)
+
+    return diagnostics
+
+
+def process_distributors(
+    workers: int = 1,
+    keep_temp_files: bool = False,
+    incremental: bool = True,
+    sqlite: bool = False,
+    covers: dict[str, tuple[tuple[int, int], SheetSnapshot]] | None = None,
+    backend: Literal["xlsx", "openpyxl"] = "xlsx",
+    base_path: str | None = None,
+    profile: bool | None = None,
+    resume: bool = False,
+    selection: Selection | None = None,
+    executor: Executor | None = None
+):
+    base_path = get_base_path(base_path)
+    profile = is_profiling_requested() if profile is None else profile
+
+    with collect() as collector, record(enabled=profile) as recorder:
+        _process_distributors(
+            workers=workers,
+            keep_temp_files=keep_temp_files,
+            incremental=incremental,
+            sqlite=sqlite,
+            covers=covers,
+            backend=backend,
+            base_path=base_path,
+            profile=profile,
+            resume=resume,
+            selection=selection,
+            executor=executor
+        )
+
+        if selection:
+            # a selective run only replaces the failures of the distributors it covered
+            collector.extend(_get_unselected_diagnostics(base_path, selection))
+
+    report_path = collector.write(base_path)
+
+    if report_path:
+        print(f"\n{collector.summary()}. Relatório salvo em {report_path}")
+
+    if recorder is not None:
+        profile_path, chrome_path = get_profile_paths(base_path)
+        recorder.write(profile_path, chrome_path)
+
+        print(recorder.summary())
+        print(f"\nPerfil de execução salvo em {profile_path}")
+
+
+def _process_distributors(
+    workers: int,
+    keep_temp_files: bool,
+    incremental: bool,
+    sqlite: bool,
+    covers: dict[str, tuple[tuple[int, int], SheetSnapshot]] | None,
+    backend: Literal["xlsx", "openpyxl"],
+    base_path: str,
+    profile: bool,
+    resume: bool,
+    selection: Selection | None,
+    executor: Executor | None
+):
     distributors_path = os.path.join(base_path, "Distribuidoras")
 
     distributors = [
         name for name in os.listdir(distributors_path)
         if os.path.isdir(os.path.join(distributors_path, name))
+        and (selection is None or selection.includes_distributor(name))
     ]
 
     distributors.sort()
 
+    get_extraction_plan()
+
+    _remove_interrupted_files(base_path, keep_temp_files)
+
+    jobs = _get_file_jobs(distributors_path, distributors)
+
+    if covers:
+        jobs = [_attach_cover(job, covers) for job in jobs]
+
+    if incremental:
+        manifest = Manifest.load(base_path)
+    else:
+        manifest = Manifest(base_path=base_path, config_hashes=get_config_hashes())
+
+    unfinished_distributors = manifest.replay_journal() if resume else set()
+    manifest.open_journal(resume=resume)
+
+    affected_distributors = manifest.remove_missing(
+        [job.file_path for job in jobs],
+        distributors=set(distributors) if selection else None
+    )
+    affected_distributors |= unfinished_distributors
+    file_rows = {}
+    pending_jobs = []
+
+    for job in jobs:
+        row_set = manifest.get_row_set(job.file_path)
+
+        if row_set is None:
+            pending_jobs.append(job)
+        else:
+            file_rows[job.file_path] = row_set
+            extend(manifest.get_diagnostics(job.file_path))
+
+    incomplete_distributors = set()
+
+    if selection:
+        pending_jobs, skipped_jobs = _select_jobs(pending_jobs, selection, workers)
+
+        # files left out of the selection keep the rows they had in the last run
+        for job in skipped_jobs:
+            row_set = manifest.get_stored_row_set(job.file_path)
+
+            if row_set is None:
+                incomplete_distributors.add(job.distributor)
+            else:
+                file_rows[job.file_path] = row_set
+                extend(manifest.get_diagnostics(job.file_path))
+
+    for job in pending_jobs:
+        affected_distributors.add(job.distributor)
+
+    jobs_by_distributor = {}
+
+    for job in jobs:
+        jobs_by_distributor.setdefault(job.distributor, []).append(job)
+
+    sink = SQLiteSink(os.path.join(base_path, SQLITE_NAME)) if sqlite else None
+    sink_distributors = sink.get_distributors() if sink else set()
+
+    for distributor in jobs_by_distributor:
+        bank_path = _get_bank_path(os.path.join(distributors_path, distributor), distributor)
+
+        if not os.path.exists(bank_path) or (sink and distributor not in sink_distributors):
+            affected_distributors.add(distributor)
+
+    remaining_jobs = {distributor: 0 for distributor in affected_distributors}
+
+    for job in pending_jobs:
+        remaining_jobs[job.distributor] += 1
+
+    # only the distributors rebuilt in this run need their rows in memory
+    for job in jobs:
+        if job.distributor not in affected_distributors:
+            file_rows.pop(job.file_path, None)
+
+    def consolidate(distributor: str):
+        if distributor in incomplete_distributors:
+            tqdm.write(f"\nBanco de dados de {distributor} mantido: há planilhas fora da seleção que nunca foram extraídas")
+            return
+
+        # a consolidated distributor's rows are released before the next one is extracted
+        row_sets = [
+            file_rows.pop(job.file_path)
+            for job in jobs_by_distributor.get(distributor, [])
+            if job.file_path in file_rows
+        ]
+
+        with span("consolidate", distributor=distributor):
+            _consolidate_distributor(
+                distributor_path=os.path.join(distributors_path, distributor),
+                distributor=distributor,
+                row_sets=row_sets
+            )
+
+        if sink and row_sets:
+            sink.replace_distributors(
+                header_rows=row_sets[0].header_rows,
+                rows_by_distributor={distributor: [row for row_set in row_sets for row in row_set.value_rows]}
+            )
+        elif sink:
+            sink.delete_distributor(distributor)
+
+        manifest.store_distributor(distributor)
+
+    for distributor in sorted(affected_distributors):
+        if remaining_jobs[distributor] == 0:
+            consolidate(distributor)
+
+    extract_file = partial(_extract_file, backend=backend, profile=profile)
+
+    # a pool passed in by the caller outlives this run, so only our own pool is shut down
+    owns_executor = executor is None
+
+    if owns_executor:
+        executor = _get_executor(workers)
+
+    try:
+        if executor:
+            results = executor.map(extract_file, pending_jobs, chunksize=1)
+        else:
+            results = map(extract_file, pending_jobs)
+
+        with tqdm(total=len(pending_jobs), desc="Processando planilhas...") as progress:
+            for result in results:
+                job = result.job
+                progress.set_postfix_str(f"{job.distributor} - {job.type}")
+                progress.update()
+                merge(result.trace)
+                extend(result.diagnostics)
+
+                if result.error is not None:
+                    report("extraction", f"Falha ao filtrar planilha: {result.error}", file=job.file_path)
+                else:
+                    file_rows[job.file_path] = result.row_set
+                    manifest.store_row_set(job.file_path, job.distributor, result.row_set, result.diagnostics)
+
+                    if keep_temp_files:
+                        _save_rows(result.row_set, _get_temp_path(distributors_path, job))
+
+                remaining_jobs[job.distributor] -= 1
+
+                if remaining_jobs[job.distributor] == 0:
+                    consolidate(job.distributor)
+    except BaseException:
+        # the journal stays on disk so the next run can resume from it
+        manifest.close_journal()
+        raise
+    finally:
+        if executor and owns_executor:
+            executor.shutdown(cancel_futures=True)
+
+        if sink:
+            sink.close()
+
+    with span("manifest_save"):
+        manifest.save()
+
+
+def _get_bank_paths(distributors_path: str, distributors: list[str]) -> list[str]:
     file_paths = []
 
     for distributor in tqdm(distributors, desc="Processando distribuidoras..."):
@@ -468,31 +937,29 @@ def process_data_bases():
 
         db_path = os.path.join(distributor_path, "Banco de Dados")
 
+        if not os.path.isdir(db_path):
+            continue
+
         file_names = [
             name for name in os.listdir(db_path)
             if (name.endswith(".xlsx") or name.endswith(".xlsm")) 
             and not name.startswith("~$")
         ]
 
-        for file_name in tqdm(file_names, desc=f"{distributor} - {type}", leave=False):
+        for file_name in tqdm(file_names, desc=distributor, leave=False):
             file_path = os.path.join(db_path, file_name)
             file_paths.append(file_path)
 
-    if file_paths:
-        output_path = os.path.join(base_path, "BANCO.xlsx")
-
-        _mix_db_files(
-            file_paths=file_paths,
-            output_name=output_path,
-            sort_workbooks=False
-        )
-
-        print(f"\nBanco de dados consolidado em {output_path}")
+    return file_paths
 
 
-def remove_dbs():
-    base_path = os.path.join(os.path.dirname(__file__), "../../")
-    base_path = os.path.abspath(base_path)
+def process_data_bases(
+    incremental: bool = True,
+    columnar_format: Literal["parquet", "arrow"] | None = None,
+    sqlite: bool = False,
+    base_path: str | None = None
+):
+    base_path = get_base_path(base_path)
 
     distributors_path = os.path.join(base_path, "Distribuidoras")
 
@@ -503,18 +970,74 @@ def remove_dbs():
 
     distributors.sort()
 
-    for distributor in distributors:
-        distributor_path = os.path.join(distributors_path, distributor)
-        db_path = os.path.join(distributor_path, "Banco de Dados")
+    file_paths = _get_bank_paths(distributors_path, distributors)
 
-        file_names = [
-            name for name in os.listdir(db_path)
-            if (name.endswith(".xlsx") or name.endswith(".xlsm")) 
-            and not name.startswith("~$")
-        ]
+    if file_paths:
+        output_path = os.path.join(base_path, "BANCO.xlsx")
+        output_paths = [output_path]
 
-        for file_name in file_names:
-            file_path = os.path.join(db_path, file_name)
-            os.remove(file_path)
+        if columnar_format:
+            columnar_path = os.path.join(base_path, f"BANCO{COLUMNAR_SUFFIXES[columnar_format]}")
+            output_paths.append(columnar_path)
+
+        if sqlite:
+            sqlite_path = os.path.join(base_path, SQLITE_NAME)
+            output_paths.append(sqlite_path)
+
+        manifest = Manifest.load(base_path)
+        bank_state = manifest.get_bank_state(file_paths)
+
+        is_updated = (
+            incremental
+            and manifest.banks == bank_state
+            and all(os.path.exists(path) for path in output_paths)
+        )
+
+        if is_updated:
+            print(f"\nBanco de dados {output_path} já está atualizado")
+            return
+
+        header_rows, _ = _iter_bank_rows(file_paths[0])
+        columnar_rows = [] if columnar_format else None
+        rows_by_distributor = {} if sqlite else None
+
+        with BankWriter(output_name=output_path, header_rows=header_rows) as writer:
+            for file_path in file_paths:
+                _, rows = _iter_bank_rows(file_path)
+
+                for row in rows:
+                    writer.append(row)
+
+                    if columnar_rows is not None:
+                        columnar_rows.append(row)
+
+                    if rows_by_distributor is not None:
+                        rows_by_distributor.setdefault(row[0], []).append(row)
+
+        print(f"\nBanco de dados consolidado em {output_path}")
+
+        if columnar_format:
+            write_columnar(
+                header_rows=header_rows,
+                rows=columnar_rows,
+                output_name=columnar_path,
+                format=columnar_format
+            )
+
+            print(f"\nBanco de dados colunar salvo em {columnar_path}")
+
+        if sqlite:
+            with SQLiteSink(sqlite_path) as sink:
+                sink.replace_distributors(
+                    header_rows=header_rows,
+                    rows_by_distributor=rows_by_distributor
+                )
+
+                for distributor in sink.get_distributors() - rows_by_distributor.keys():
+                    sink.delete_distributor(distributor)
+
+            print(f"\nBanco de dados SQLite salvo em {sqlite_path}")
+
+        manifest.banks = bank_state
+        manifest.save()
 
-        os.rmdir(db_path)
\ No newline at end of file
@@ -0,0 +1,140 @@
+from contextlib import contextmanager
+from typing import NamedTuple
+import json
+import csv
+import os
+
+
+REPORT_NAME = "falhas"
+COVER_REPORT_NAME = "falhas_capas"
+
+_collector: "Collector | None" = None
+
+
+class Diagnostic(NamedTuple):
+    file: str | None
+    sheet: str | None
+    coordinate: str | None
+    kind: str
+    stage: str | None
+    message: str
+
+
+class Collector:
+    def __init__(self, file: str | None = None):
+        self.file = file
+        self.stage = None
+        self.diagnostics = []
+
+    def report(
+        self,
+        kind: str,
+        message: str,
+        sheet: str | None = None,
+        coordinate: str | None = None,
+        file: str | None = None
+    ):
+        self.diagnostics.append(Diagnostic(
+            file=file or self.file,
+            sheet=sheet,
+            coordinate=coordinate,
+            kind=kind,
+            stage=self.stage,
+            message=message
+        ))
+
+    def export(self) -> list[list[any]]:
+        return [list(diagnostic) for diagnostic in self.diagnostics]
+
+    def extend(self, diagnostics: list[list[any]]):
+        self.diagnostics.extend(Diagnostic(*diagnostic) for diagnostic in diagnostics)
+
+    def write(self, base_path: str, name: str = REPORT_NAME) -> str | None:
+        json_path, csv_path = get_report_paths(base_path, name)
+
+        if not self.diagnostics:
+            # a clean run must not leave the previous run's failures behind
+            for path in (json_path, csv_path):
+                if os.path.exists(path):
+                    os.remove(path)
+
+            return None
+
+        with open(json_path, 'w', encoding='utf-8') as file:
+            json.dump([diagnostic._asdict() for diagnostic in self.diagnostics], file, ensure_ascii=False, indent=2)
+
+        with open(csv_path, 'w', encoding='utf-8-sig', newline='') as file:
+            writer = csv.writer(file, delimiter=';')
+            writer.writerow(Diagnostic._fields)
+            writer.writerows(self.diagnostics)
+
+        return json_path
+
+    def summary(self) -> str:
+        kinds = {}
+
+        for diagnostic in self.diagnostics:
+            kinds[diagnostic.kind] = kinds.get(diagnostic.kind, 0) + 1
+
+        files = {diagnostic.file for diagnostic in self.diagnostics}
+        counts = ", ".join(f"{kind}={amount}" for kind, amount in sorted(kinds.items()))
+
+        return f"{len(self.diagnostics)} falhas em {len(files)} planilhas ({counts})"
+
+
+def get_report_paths(base_path: str, name: str = REPORT_NAME) -> tuple[str, str]:
+    return os.path.join(base_path, f"{name}.json"), os.path.join(base_path, f"{name}.csv")
+
+
+def read_report(base_path: str, name: str = REPORT_NAME) -> list[Diagnostic]:
+    json_path, _ = get_report_paths(base_path, name)
+
+    try:
+        with open(json_path, 'r', encoding='utf-8') as file:
+            return [Diagnostic(**diagnostic) for diagnostic in json.load(file)]
+    except (FileNotFoundError, json.JSONDecodeError, TypeError):
+        return []
+
+
+@contextmanager
+def collect(file: str | None = None):
+    global _collector
+
+    previous = _collector
+    _collector = Collector(file=file)
+
+    try:
+        yield _collector
+    finally:
+        _collector = previous
+
+
+@contextmanager
+def stage(name: str):
+    if _collector is None:
+        yield
+        return
+
+    previous = _collector.stage
+    _collector.stage = name
+
+    try:
+        yield
+    finally:
+        _collector.stage = previous
+
+
+def report(
+    kind: str,
+    message: str,
+    sheet: str | None = None,
+    coordinate: str | None = None,
+    file: str | None = None
+):
+    if _collector is not None:
+        _collector.report(kind, message, sheet=sheet, coordinate=coordinate, file=file)
+
+
+def extend(diagnostics: list[list[any]] | None):
+    if _collector is not None and diagnostics:
+        _collector.extend(diagnostics)
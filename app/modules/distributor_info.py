@@ -1,70 +1,101 @@
 from openpyxl import load_workbook
 from openpyxl.worksheet.worksheet import Worksheet
+from .profiling import count, span
 import os
 
 
-def load_distributors_sheet() -> Worksheet:
+def _get_distributors_path() -> str:
     file_path = os.path.join(os.path.dirname(__file__), "../../distribuidoras.xlsx")
-    file_path = os.path.abspath(file_path)
+    return os.path.abspath(file_path)
+
+
+def load_distributors_sheet() -> Worksheet:
+    file_path = _get_distributors_path()
 
     workbook = load_workbook(file_path, keep_links=False, read_only=True, data_only=True)
     return workbook.active
 
 
-def get_distributor_info(distributor: str):
-    name = get_column_info(
-        unknown_column_name="NOME",
-        known_column_name="SIGLA",
-        known_value=distributor
-    )
+class DistributorRegistry:
+    def __init__(self, header: list[str], rows: list[tuple], mtime: float):
+        self.header = header
+        self.rows = rows
+        self.mtime = mtime
+        self._indexes = {}
 
-    agent = get_column_info(
-        unknown_column_name="AGENTE",
-        known_column_name="SIGLA",
-        known_value=distributor
-    )
+    @classmethod
+    def load(cls, file_path: str):
+        mtime = os.path.getmtime(file_path)
 
-    concession_id = get_column_info(
-        unknown_column_name="ID CONCESSÃO",
-        known_column_name="SIGLA",
-        known_value=distributor
-    )
+        with span("registry_load"):
+            workbook = load_workbook(file_path, keep_links=False, read_only=True, data_only=True)
 
-    code = get_column_info(
-        unknown_column_name="CÓDIGO",
-        known_column_name="SIGLA",
-        known_value=distributor
-    )
+            try:
+                worksheet = workbook.active
+                rows = worksheet.iter_rows(values_only=True)
+                header = list(next(rows, ()))
+                rows = [tuple(row) for row in rows]
+            finally:
+                workbook.close()
 
-    agent_id = get_column_info(
-        unknown_column_name="ID AGENTE",
-        known_column_name="SIGLA",
-        known_value=distributor
-    )
+        return cls(header=header, rows=rows, mtime=mtime)
 
-    return {
-        'SIGLA': distributor,
-        'NOME': name,
-        'AGENTE': agent,
-        'ID CONCESSÃO': concession_id,
-        'CÓDIGO': code,
-        'ID AGENTE': agent_id
-    }
+    def _get_index(self, column_name: str) -> dict:
+        index = self._indexes.get(column_name)
 
+        if index is None:
+            column_index = self.header.index(column_name)
+            index = {}
 
+            for row in self.rows:
+                # keeps the first match, like the old top-down scan did
+                index.setdefault(row[column_index], row)
 
-def get_column_info(unknown_column_name: str, known_column_name: str, known_value: str):
-    worksheet = load_distributors_sheet()
+            self._indexes[column_name] = index
+
+        return index
+
+    def get_column_info(self, unknown_column_name: str, known_column_name: str, known_value: any):
+        count("registry_lookups")
+        unknown_value_index = self.header.index(unknown_column_name)
+        row = self._get_index(known_column_name).get(known_value)
+
+        if row is None:
+            return None
 
-    header = [cell.value for cell in next(worksheet.iter_rows(min_row=1, max_row=1))]
-    known_value_index = header.index(known_column_name)
-    unknown_value_index = header.index(unknown_column_name)
+        return row[unknown_value_index]
 
-    for row in worksheet.iter_rows(min_row=2, values_only=True):
-        known_cell = row[known_value_index]
-        unknown_cell = row[unknown_value_index]
 
-        if known_cell == known_value:
-            return unknown_cell
-        
-    return None
\ No newline at end of file
+_registry: DistributorRegistry | None = None
+
+
+def get_registry() -> DistributorRegistry:
+    global _registry
+
+    file_path = _get_distributors_path()
+
+    if _registry is None or _registry.mtime != os.path.getmtime(file_path):
+        _registry = DistributorRegistry.load(file_path)
+
+    return _registry
+
+
+def get_distributor_info(distributor: str):
+    registry = get_registry()
+
+    return {
+        'SIGLA': distributor,
+        'NOME': registry.get_column_info("NOME", "SIGLA", distributor),
+        'AGENTE': registry.get_column_info("AGENTE", "SIGLA", distributor),
+        'ID CONCESSÃO': registry.get_column_info("ID CONCESSÃO", "SIGLA", distributor),
+        'CÓDIGO': registry.get_column_info("CÓDIGO", "SIGLA", distributor),
+        'ID AGENTE': registry.get_column_info("ID AGENTE", "SIGLA", distributor)
+    }
+
+
+def get_column_info(unknown_column_name: str, known_column_name: str, known_value: str):
+    return get_registry().get_column_info(
+        unknown_column_name=unknown_column_name,
+        known_column_name=known_column_name,
+        known_value=known_value
+    )
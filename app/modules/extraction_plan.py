@@ -0,0 +1,194 @@
+from openpyxl.utils.cell import coordinate_from_string, column_index_from_string
+from dataclasses import dataclass
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Literal, Mapping
+from .utils import get_json_data, normalize
+import os
+
+
+DETAILS_PATH = os.path.join(os.path.dirname(__file__), "details.json")
+OM_INFO_PATH = os.path.join(os.path.dirname(__file__), "real_OM_info.json")
+
+FIXED_COLUMNS = (
+    "SIGLA",
+    "NOME",
+    "AGENTE",
+    "ID CONCESSÃO",
+    "CÓDIGO",
+    "ID AGENTE",
+    "Ano",
+    "Contrato",
+    "Tipo de Processo"
+)
+
+SPECIFIC_TAB_INDEXES = (81, 82, 83, 84, 85, 86, 96)
+REAJUSTE_SKIP_RANGE = range(0, 81)
+
+
+@dataclass(frozen=True)
+class PlanStep:
+    index: int
+    kind: Literal["cell", "add", "specific", "na"]
+    tab_name: str = ""
+    coordinates: tuple[str, ...] = ()
+    cells: tuple[tuple[int, int], ...] = ()
+
+
+@dataclass(frozen=True)
+class ExtractionPlan:
+    fixed_columns: tuple[str, ...]
+    header_rows: tuple[tuple[any, ...], ...]
+    steps: tuple[PlanStep, ...]
+    cells_by_tab: Mapping[str, tuple[tuple[int, int], ...]]
+    reajuste_skip_range: range
+
+    @property
+    def width(self) -> int:
+        return len(self.steps)
+
+
+@dataclass(frozen=True)
+class OMPlan:
+    base_name: str
+    items: tuple[str, ...]
+    sub_items: tuple[tuple[str, ...], ...]
+    section_labels: tuple[str, ...]
+    sub_item_labels: tuple[tuple[str, ...], ...]
+
+
+def _parse_coordinate(coordinate: str, index: int) -> tuple[int, int]:
+    try:
+        column_letter, row = coordinate_from_string(coordinate)
+        return row, column_index_from_string(column_letter)
+    except Exception:
+        raise ValueError(f"Coordenada inválida '{coordinate}' na posição {index} de details.json")
+
+
+def _compile_step(index: int, tab_name: str, coordinate: any) -> PlanStep:
+    if tab_name == "":
+        if index in SPECIFIC_TAB_INDEXES:
+            return PlanStep(index=index, kind="specific")
+
+        return PlanStep(index=index, kind="na")
+
+    if not isinstance(coordinate, str) or not coordinate:
+        raise ValueError(f"Coordenada ausente para a aba {tab_name} na posição {index} de details.json")
+
+    if coordinate.startswith("ADD"):
+        codes = tuple(coordinate.split("-")[1:])
+
+        if not codes:
+            raise ValueError(f"Soma '{coordinate}' sem coordenadas na posição {index} de details.json")
+
+        kind = "add"
+    else:
+        codes = (coordinate,)
+        kind = "cell"
+
+    return PlanStep(
+        index=index,
+        kind=kind,
+        tab_name=tab_name,
+        coordinates=codes,
+        cells=tuple(_parse_coordinate(code, index) for code in codes)
+    )
+
+
+def _expand_header(header: dict) -> tuple[any, ...]:
+    items = header['items']
+
+    if not header['repeats']:
+        return tuple(items)
+
+    repetitions = header['repetitions']
+
+    if len(repetitions) != len(items):
+        raise ValueError("Cabeçalho de details.json com 'items' e 'repetitions' de tamanhos diferentes")
+
+    all_items = []
+
+    for item, repetition in zip(items, repetitions):
+        all_items.extend([item] * repetition)
+
+    return tuple(all_items)
+
+
+def compile_plan(json_data: any) -> ExtractionPlan:
+    headers = json_data['headers']
+    useful_headers = [header for header in headers if not header['repeats']]
+
+    if len(useful_headers) != 1:
+        raise ValueError("details.json deve ter exatamente um cabeçalho sem repetições")
+
+    useful_header = useful_headers[0]
+    tabs = useful_header['tabs']
+    coordinates = useful_header['coordinates']
+
+    if len(tabs) != len(coordinates) or len(tabs) != len(useful_header['items']):
+        raise ValueError("details.json com 'items', 'tabs' e 'coordinates' de tamanhos diferentes")
+
+    header_rows = tuple(_expand_header(header) for header in headers)
+
+    for header_row in header_rows:
+        if len(header_row) != len(tabs):
+            raise ValueError("Cabeçalho de details.json com largura diferente do número de colunas")
+
+    steps = tuple(
+        _compile_step(index, tab_name, coordinate)
+        for index, (tab_name, coordinate) in enumerate(zip(tabs, coordinates))
+    )
+
+    cells_by_tab = {}
+
+    for step in steps:
+        if step.cells:
+            cells_by_tab.setdefault(step.tab_name, []).extend(step.cells)
+
+    cells_by_tab = MappingProxyType({
+        tab_name: tuple(sorted(set(cells)))
+        for tab_name, cells in cells_by_tab.items()
+    })
+
+    return ExtractionPlan(
+        fixed_columns=FIXED_COLUMNS,
+        header_rows=header_rows,
+        steps=steps,
+        cells_by_tab=cells_by_tab,
+        reajuste_skip_range=REAJUSTE_SKIP_RANGE
+    )
+
+
+@lru_cache(maxsize=None)
+def get_extraction_plan(json_path: str = DETAILS_PATH) -> ExtractionPlan:
+    return compile_plan(get_json_data(json_path))
+
+
+def compile_OM_plan(json_data: any) -> OMPlan:
+    items = tuple(json_data['items'])
+    sub_items = tuple(tuple(minor_items) for minor_items in json_data['sub_items'])
+
+    if len(items) != len(sub_items):
+        raise ValueError("real_OM_info.json com 'items' e 'sub_items' de tamanhos diferentes")
+
+    # the last account has no "CONTA" prefix on the Entrada sheet
+    section_labels = tuple(
+        normalize(item) if index == len(items) - 1 else f"CONTA {normalize(item)}"
+        for index, item in enumerate(items)
+    )
+
+    return OMPlan(
+        base_name=json_data['base_name'],
+        items=items,
+        sub_items=sub_items,
+        section_labels=section_labels,
+        sub_item_labels=tuple(
+            tuple(normalize(minor_item) for minor_item in minor_items)
+            for minor_items in sub_items
+        )
+    )
+
+
+@lru_cache(maxsize=None)
+def get_OM_plan(json_path: str = OM_INFO_PATH) -> OMPlan:
+    return compile_OM_plan(get_json_data(json_path))
@@ -0,0 +1,291 @@
+from datetime import date, datetime, time
+from hashlib import sha256
+from .row_sets import RowSet
+import json
+import os
+
+
+MANIFEST_NAME = ".banco_manifest.json"
+JOURNAL_NAME = ".banco_journal.jsonl"
+MANIFEST_VERSION = 2
+
+MODULES_PATH = os.path.dirname(__file__)
+
+CONFIG_FILES = (
+    os.path.join(MODULES_PATH, "details.json"),
+    os.path.join(MODULES_PATH, "real_OM_info.json"),
+    os.path.join(MODULES_PATH, "../../distribuidoras.xlsx")
+)
+
+EXTRACTION_SOURCES = (
+    "cover_info.py",
+    "data.py",
+    "distributor_info.py",
+    "extraction_plan.py",
+    "row_sets.py",
+    "sheet_info.py",
+    "sheet_snapshot.py",
+    "specific_info.py",
+    "utils.py",
+    "xlsx_reader.py"
+)
+
+
+def hash_file(file_path: str) -> str:
+    digest = sha256()
+
+    with open(file_path, 'rb') as file:
+        for chunk in iter(lambda: file.read(1024 * 1024), b''):
+            digest.update(chunk)
+
+    return digest.hexdigest()
+
+
+def get_config_hashes() -> dict[str, str]:
+    config_hashes = {
+        os.path.basename(file_path): hash_file(file_path)
+        for file_path in CONFIG_FILES
+    }
+
+    extraction_digest = sha256()
+
+    for source in EXTRACTION_SOURCES:
+        with open(os.path.join(MODULES_PATH, source), 'rb') as file:
+            extraction_digest.update(file.read())
+
+    config_hashes["extraction"] = extraction_digest.hexdigest()
+
+    return config_hashes
+
+
+def encode_value(value: any) -> any:
+    if isinstance(value, datetime):
+        return {"datetime": value.isoformat()}
+
+    if isinstance(value, date):
+        return {"date": value.isoformat()}
+
+    if isinstance(value, time):
+        return {"time": value.isoformat()}
+
+    return value
+
+
+def decode_value(value: any) -> any:
+    if isinstance(value, dict):
+        if "datetime" in value:
+            return datetime.fromisoformat(value["datetime"])
+
+        if "date" in value:
+            return date.fromisoformat(value["date"])
+
+        if "time" in value:
+            return time.fromisoformat(value["time"])
+
+    return value
+
+
+def encode_rows(rows: tuple[tuple[any, ...], ...]) -> list[list[any]]:
+    return [[encode_value(value) for value in row] for row in rows]
+
+
+def decode_rows(rows: list[list[any]]) -> tuple[tuple[any, ...], ...]:
+    return tuple(tuple(decode_value(value) for value in row) for row in rows)
+
+
+def write_json_atomically(file_path: str, json_data: any):
+    temp_path = f"{file_path}.tmp"
+
+    with open(temp_path, 'w', encoding='utf-8') as file:
+        json.dump(json_data, file, ensure_ascii=False)
+        file.flush()
+        os.fsync(file.fileno())
+
+    os.replace(temp_path, file_path)
+
+
+class Manifest:
+    def __init__(self, base_path: str, config_hashes: dict[str, str], json_data: dict | None = None):
+        self.base_path = base_path
+        self.path = os.path.join(base_path, MANIFEST_NAME)
+        self.config_hashes = config_hashes
+
+        json_data = json_data or {}
+        is_valid = (
+            json_data.get("version") == MANIFEST_VERSION
+            and json_data.get("config") == config_hashes
+        )
+
+        self.header_rows = decode_rows(json_data.get("header_rows", [])) if is_valid else ()
+        self.files = json_data.get("files", {}) if is_valid else {}
+        self.banks = json_data.get("banks", {}) if is_valid else {}
+
+        self.journal_path = os.path.join(base_path, JOURNAL_NAME)
+        self._journal = None
+        self._is_journal_replayed = False
+
+    @classmethod
+    def load(cls, base_path: str):
+        config_hashes = get_config_hashes()
+        path = os.path.join(base_path, MANIFEST_NAME)
+
+        try:
+            with open(path, 'r', encoding='utf-8') as file:
+                json_data = json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            json_data = None
+
+        return cls(base_path=base_path, config_hashes=config_hashes, json_data=json_data)
+
+    def _get_key(self, file_path: str) -> str:
+        return os.path.relpath(file_path, self.base_path)
+
+    def get_row_set(self, file_path: str) -> RowSet | None:
+        entry = self.files.get(self._get_key(file_path))
+
+        if entry is None or not self.header_rows:
+            return None
+
+        stat = os.stat(file_path)
+
+        if entry["size"] != stat.st_size or entry["mtime_ns"] != stat.st_mtime_ns:
+            if entry["size"] != stat.st_size or entry["sha256"] != hash_file(file_path):
+                return None
+
+            entry["mtime_ns"] = stat.st_mtime_ns
+
+        return self.get_stored_row_set(file_path)
+
+    def get_stored_row_set(self, file_path: str) -> RowSet | None:
+        # the last rows extracted from the file, even if it changed since
+        entry = self.files.get(self._get_key(file_path))
+
+        if entry is None or not self.header_rows:
+            return None
+
+        return RowSet(
+            sort_key=tuple(entry["sort_key"]),
+            rows=self.header_rows + decode_rows(entry["rows"])
+        )
+
+    def get_diagnostics(self, file_path: str) -> list[list[any]]:
+        entry = self.files.get(self._get_key(file_path))
+        return entry.get("diagnostics", []) if entry else []
+
+    def store_row_set(self, file_path: str, distributor: str, row_set: RowSet, diagnostics: list[list[any]] | None = None):
+        stat = os.stat(file_path)
+        key = self._get_key(file_path)
+
+        if row_set.header_rows != self.header_rows:
+            self.header_rows = row_set.header_rows
+            self._write_journal({"type": "header", "header_rows": encode_rows(self.header_rows)})
+
+        self.files[key] = {
+            "distributor": distributor,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "sha256": hash_file(file_path),
+            "sort_key": list(row_set.sort_key),
+            "rows": encode_rows(row_set.value_rows),
+            "diagnostics": diagnostics or []
+        }
+
+        self._write_journal({"type": "file", "key": key, "entry": self.files[key]})
+
+    def store_distributor(self, distributor: str):
+        self._write_journal({"type": "distributor", "distributor": distributor})
+
+    def replay_journal(self) -> set[str]:
+        try:
+            with open(self.journal_path, 'r', encoding='utf-8') as file:
+                lines = file.readlines()
+        except FileNotFoundError:
+            return set()
+
+        records = []
+
+        for line in lines:
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                # the last line may be cut short by the interruption
+                break
+
+        if not records or records[0].get("config") != self.config_hashes or records[0].get("version") != MANIFEST_VERSION:
+            return set()
+
+        self._is_journal_replayed = True
+        started = set()
+        finished = set()
+
+        for record in records[1:]:
+            if record["type"] == "header":
+                self.header_rows = decode_rows(record["header_rows"])
+            elif record["type"] == "file":
+                self.files[record["key"]] = record["entry"]
+                started.add(record["entry"]["distributor"])
+                finished.discard(record["entry"]["distributor"])
+            elif record["type"] == "distributor":
+                finished.add(record["distributor"])
+
+        return started - finished
+
+    def open_journal(self, resume: bool = False):
+        is_appending = resume and self._is_journal_replayed
+        self._journal = open(self.journal_path, 'a' if is_appending else 'w', encoding='utf-8')
+
+        if not is_appending:
+            self._write_journal({"type": "start", "version": MANIFEST_VERSION, "config": self.config_hashes})
+
+            if self.header_rows:
+                self._write_journal({"type": "header", "header_rows": encode_rows(self.header_rows)})
+
+    def _write_journal(self, record: dict):
+        if self._journal is None:
+            return
+
+        self._journal.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._journal.flush()
+        os.fsync(self._journal.fileno())
+
+    def close_journal(self):
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+
+    def remove_missing(self, file_paths: list[str], distributors: set[str] | None = None) -> set[str]:
+        existing_keys = {self._get_key(file_path) for file_path in file_paths}
+        missing_keys = [
+            key for key, entry in self.files.items()
+            if key not in existing_keys
+            and (distributors is None or entry["distributor"] in distributors)
+        ]
+
+        distributors = set()
+
+        for key in missing_keys:
+            distributors.add(self.files.pop(key)["distributor"])
+
+        return distributors
+
+    def get_bank_state(self, file_paths: list[str]) -> dict[str, list[int]]:
+        bank_state = {}
+
+        for file_path in file_paths:
+            stat = os.stat(file_path)
+            bank_state[self._get_key(file_path)] = [stat.st_size, stat.st_mtime_ns]
+
+        return bank_state
+
+    def save(self):
+        write_json_atomically(self.path, {
+            "version": MANIFEST_VERSION,
+            "config": self.config_hashes,
+            "header_rows": encode_rows(self.header_rows),
+            "files": self.files,
+            "banks": self.banks
+        })
+
+        if self._journal is not None:
+            self.close_journal()
+            os.remove(self.journal_path)
@@ -0,0 +1,199 @@
+from contextlib import contextmanager, nullcontext
+from functools import wraps
+from time import perf_counter_ns, time_ns
+import json
+import os
+
+
+PROFILE_ENV = "SPARTA_PROFILE"
+CHROME_TRACE_ENV = "SPARTA_PROFILE_CHROME"
+PROFILE_NAME = "perfil.jsonl"
+CHROME_TRACE_NAME = "perfil.trace.json"
+
+FILE_SPAN = "file"
+
+_NULL_SPAN = nullcontext()
+_recorder: "Recorder | None" = None
+
+
+def _is_truthy(value: str | None) -> bool:
+    return bool(value) and value.strip().lower() not in ("0", "false", "no", "nao", "não")
+
+
+def is_profiling_requested() -> bool:
+    return _is_truthy(os.environ.get(PROFILE_ENV))
+
+
+def get_profile_paths(base_path: str) -> tuple[str, str | None]:
+    value = os.environ.get(PROFILE_ENV, "")
+
+    if _is_truthy(value) and value.strip().lower() not in ("1", "true", "yes", "sim"):
+        profile_path = value
+    else:
+        profile_path = os.path.join(base_path, PROFILE_NAME)
+
+    chrome_path = None
+
+    if _is_truthy(os.environ.get(CHROME_TRACE_ENV)):
+        chrome_path = os.path.join(os.path.dirname(os.path.abspath(profile_path)), CHROME_TRACE_NAME)
+
+    return profile_path, chrome_path
+
+
+class Recorder:
+    def __init__(self, file: str | None = None):
+        self.file = file
+        self.pid = os.getpid()
+        self.events = []
+        self.counters = {}
+        self.file_stats = {}
+
+    @contextmanager
+    def span(self, name: str, **args):
+        start_ts = time_ns() // 1000
+        start = perf_counter_ns()
+
+        try:
+            yield
+        finally:
+            event = {
+                "name": name,
+                "ts": start_ts,
+                "dur": (perf_counter_ns() - start) // 1000,
+                "pid": self.pid
+            }
+
+            if self.file is not None:
+                event["file"] = self.file
+
+            if args:
+                event["args"] = args
+
+            self.events.append(event)
+
+    def count(self, name: str, amount: int = 1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def export(self) -> dict:
+        return {
+            "file": self.file,
+            "events": self.events,
+            "counters": self.counters
+        }
+
+    def merge(self, trace: dict):
+        self.events.extend(trace["events"])
+
+        for name, amount in trace["counters"].items():
+            self.count(name, amount)
+
+        if trace["file"] is not None:
+            file_seconds = sum(
+                event["dur"] for event in trace["events"]
+                if event["name"] == FILE_SPAN
+            ) / 1e6
+
+            self.file_stats[trace["file"]] = {"seconds": file_seconds, **trace["counters"]}
+
+    def write(self, profile_path: str, chrome_path: str | None = None):
+        with open(profile_path, 'w', encoding='utf-8') as file:
+            for event in self.events:
+                file.write(json.dumps({"type": "span", **event}, ensure_ascii=False) + "\n")
+
+            for file_path, stats in self.file_stats.items():
+                file.write(json.dumps({"type": "file", "file": file_path, **stats}, ensure_ascii=False) + "\n")
+
+            file.write(json.dumps({"type": "counters", **self.counters}, ensure_ascii=False) + "\n")
+
+        if chrome_path:
+            chrome_events = [
+                {
+                    "name": event["name"],
+                    "ph": "X",
+                    "ts": event["ts"],
+                    "dur": event["dur"],
+                    "pid": event["pid"],
+                    "tid": event["pid"],
+                    "args": {"file": event.get("file"), **event.get("args", {})}
+                }
+                for event in self.events
+            ]
+
+            with open(chrome_path, 'w', encoding='utf-8') as file:
+                json.dump({"traceEvents": chrome_events, "displayTimeUnit": "ms"}, file, ensure_ascii=False)
+
+    def summary(self, limit: int = 10) -> str:
+        stages = {}
+
+        for event in self.events:
+            if event["name"] == FILE_SPAN:
+                continue
+
+            calls, total, longest = stages.get(event["name"], (0, 0, 0))
+            stages[event["name"]] = (calls + 1, total + event["dur"], max(longest, event["dur"]))
+
+        lines = ["", "Etapas mais lentas:", f"{'etapa':<32}{'chamadas':>10}{'total (s)':>12}{'média (ms)':>12}{'máx (ms)':>12}"]
+
+        for name, (calls, total, longest) in sorted(stages.items(), key=lambda item: item[1][1], reverse=True)[:limit]:
+            lines.append(f"{name:<32}{calls:>10}{total / 1e6:>12.3f}{total / calls / 1e3:>12.2f}{longest / 1e3:>12.2f}")
+
+        lines += ["", "Planilhas mais lentas:", f"{'segundos':>10}  planilha"]
+
+        for file_path, stats in sorted(self.file_stats.items(), key=lambda item: item[1]["seconds"], reverse=True)[:limit]:
+            lines.append(f"{stats['seconds']:>10.3f}  {file_path}")
+
+        if self.counters:
+            lines += ["", "Contadores: " + ", ".join(f"{name}={amount}" for name, amount in sorted(self.counters.items()))]
+
+        return "\n".join(lines)
+
+
+@contextmanager
+def record(enabled: bool = True, file: str | None = None):
+    global _recorder
+
+    if not enabled:
+        yield None
+        return
+
+    previous = _recorder
+    _recorder = Recorder(file=file)
+
+    try:
+        yield _recorder
+    finally:
+        _recorder = previous
+
+
+def span(name: str, **args):
+    if _recorder is None:
+        return _NULL_SPAN
+
+    return _recorder.span(name, **args)
+
+
+def count(name: str, amount: int = 1):
+    if _recorder is not None:
+        _recorder.count(name, amount)
+
+
+def merge(trace: dict | None):
+    if _recorder is not None and trace is not None:
+        _recorder.merge(trace)
+
+
+def traced(name: str | None = None):
+    def decorator(function):
+        span_name = name or function.__name__
+
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            if _recorder is None:
+                return function(*args, **kwargs)
+
+            with _recorder.span(span_name):
+                return function(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,290 @@
+from array import array
+from datetime import date, datetime, time
+from math import isinf, isnan
+from typing import Iterable, Iterator
+from openpyxl.utils.datetime import from_excel, to_excel
+from .manifest import decode_value, encode_value
+from .bank_writer import PARTIAL_SUFFIX
+from .bank_files import CHUNK_SUFFIX
+import struct
+import json
+import mmap
+import os
+
+
+CHUNK_MAGIC = b"SPCHUNK\x00"
+CHUNK_VERSION = 1
+
+MAX_STRING_LENGTH = 32767
+ALIGNMENT = 8
+
+_LENGTH = struct.Struct("<Q")
+
+
+class UnsupportedValueError(ValueError):
+    pass
+
+
+def get_chunk_path(bank_path: str) -> str:
+    return os.path.splitext(bank_path)[0] + CHUNK_SUFFIX
+
+
+def _cast_number(value: int | float) -> int | float | None:
+    # the bank stores numbers as "%.16g" text and reads them back as int unless there's a "." or exponent
+    if isnan(value) or isinf(value):
+        return None
+
+    text = "%.16g" % value
+
+    if "." in text or "e" in text:
+        return float(text)
+
+    return int(text)
+
+
+def to_bank_value(value: any) -> any:
+    if value is None or isinstance(value, bool):
+        return value
+
+    if isinstance(value, (int, float)):
+        return _cast_number(value)
+
+    if isinstance(value, str):
+        value = value[:MAX_STRING_LENGTH]
+
+        if "\r" in value:
+            raise UnsupportedValueError(repr(value))
+
+        # empty strings aren't written and "=..." is written as a formula without a cached value
+        if value == "" or (len(value) > 1 and value.startswith("=")):
+            return None
+
+        return value
+
+    if isinstance(value, (datetime, date, time)):
+        # dates are stored as Excel serial numbers, which keep only millisecond precision
+        return from_excel(to_excel(value))
+
+    raise UnsupportedValueError(repr(value))
+
+
+def _get_column_type(values: list[any]) -> str:
+    present = [value for value in values if value is not None]
+
+    if not present:
+        return "empty"
+
+    value_types = {type(value) for value in present}
+
+    if value_types == {int} and all(-2 ** 63 <= value < 2 ** 63 for value in present):
+        return "int"
+
+    if value_types == {float}:
+        return "float"
+
+    if value_types == {str}:
+        return "str"
+
+    return "json"
+
+
+def _encode_column(values: list[any], column_type: str) -> list[tuple[str, bytes]]:
+    sections = []
+
+    if column_type in ("int", "float", "str") and None in values:
+        sections.append(("mask", array('B', [value is None for value in values]).tobytes()))
+
+    if column_type == "int":
+        sections.append(("data", array('q', [value or 0 for value in values]).tobytes()))
+
+    elif column_type == "float":
+        sections.append(("data", array('d', [value or 0.0 for value in values]).tobytes()))
+
+    elif column_type == "str":
+        encoded = [(value or "").encode('utf-8') for value in values]
+        offsets = array('q', [0])
+
+        for item in encoded:
+            offsets.append(offsets[-1] + len(item))
+
+        sections.append(("offsets", offsets.tobytes()))
+        sections.append(("data", b"".join(encoded)))
+
+    elif column_type == "json":
+        sections.append(("data", json.dumps([encode_value(value) for value in values], ensure_ascii=False).encode('utf-8')))
+
+    return sections
+
+
+def _decode_column(buffer: memoryview, column: dict, row_count: int) -> list[any]:
+    column_type = column["type"]
+
+    if column_type == "empty":
+        return [None] * row_count
+
+    views = {
+        name: buffer[offset:offset + size]
+        for name, (offset, size) in column["sections"].items()
+    }
+
+    try:
+        if column_type == "int":
+            values = views["data"].cast('q').tolist()
+
+        elif column_type == "float":
+            values = views["data"].cast('d').tolist()
+
+        elif column_type == "str":
+            offsets = views["offsets"].cast('q').tolist()
+            data = views["data"]
+            values = [str(data[start:end], 'utf-8') for start, end in zip(offsets, offsets[1:])]
+
+        else:
+            values = [decode_value(value) for value in json.loads(str(views["data"], 'utf-8'))]
+
+        if "mask" in views:
+            values = [None if is_none else value for value, is_none in zip(values, views["mask"].tolist())]
+    finally:
+        for view in views.values():
+            view.release()
+
+    return values
+
+
+def _to_bank_row(row: Iterable[any]) -> tuple[any, ...]:
+    row = tuple(row)
+    length = len(row)
+
+    # None cells aren't written, so the bank reads rows back without their trailing ones
+    while length and row[length - 1] is None:
+        length -= 1
+
+    return tuple(to_bank_value(value) for value in row[:length])
+
+
+def write_chunk(chunk_path: str, bank_path: str, header_rows: Iterable[tuple[any, ...]], rows: list[tuple[any, ...]]):
+    header_rows = [_to_bank_row(row) for row in header_rows]
+    rows = [_to_bank_row(row) for row in rows]
+
+    width = max((len(row) for row in rows), default=0)
+    columns = [[] for _ in range(width)]
+
+    for row in rows:
+        for index, values in enumerate(columns):
+            values.append(row[index] if index < len(row) else None)
+
+    stat = os.stat(bank_path)
+    payload = []
+    position = 0
+
+    def add_section(data: bytes) -> tuple[int, int]:
+        nonlocal position
+
+        section = (position, len(data))
+        padding = -len(data) % ALIGNMENT
+
+        payload.append(data + b"\x00" * padding)
+        position += len(data) + padding
+
+        return section
+
+    lengths = add_section(array('q', [len(row) for row in rows]).tobytes())
+    column_headers = []
+
+    for values in columns:
+        column_type = _get_column_type(values)
+
+        column_headers.append({
+            "type": column_type,
+            "sections": {
+                name: add_section(data)
+                for name, data in _encode_column(values, column_type)
+            }
+        })
+
+    header = json.dumps({
+        "version": CHUNK_VERSION,
+        "source": {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns},
+        "rows": len(rows),
+        "header_rows": [[encode_value(value) for value in row] for row in header_rows],
+        "lengths": lengths,
+        "columns": column_headers
+    }, ensure_ascii=False).encode('utf-8')
+
+    header += b" " * (-(len(CHUNK_MAGIC) + _LENGTH.size + len(header)) % ALIGNMENT)
+    partial_path = f"{chunk_path}{PARTIAL_SUFFIX}"
+
+    try:
+        with open(partial_path, 'wb') as file:
+            file.write(CHUNK_MAGIC)
+            file.write(_LENGTH.pack(len(header)))
+            file.write(header)
+
+            for data in payload:
+                file.write(data)
+
+        os.replace(partial_path, chunk_path)
+    finally:
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+
+
+class RowChunk:
+    def __init__(self, chunk_path: str, header: dict, data_offset: int):
+        self.chunk_path = chunk_path
+        self.row_count = header["rows"]
+        self.header_rows = tuple(
+            tuple(decode_value(value) for value in row)
+            for row in header["header_rows"]
+        )
+        self._lengths = header["lengths"]
+        self._columns = header["columns"]
+        self._data_offset = data_offset
+
+    @classmethod
+    def open(cls, chunk_path: str, bank_path: str) -> "RowChunk | None":
+        # a missing, unreadable or stale chunk sends the caller back to the xlsx bank
+        try:
+            with open(chunk_path, 'rb') as file:
+                if file.read(len(CHUNK_MAGIC)) != CHUNK_MAGIC:
+                    return None
+
+                header_size, = _LENGTH.unpack(file.read(_LENGTH.size))
+                header = json.loads(file.read(header_size))
+
+            stat = os.stat(bank_path)
+        except (OSError, ValueError, struct.error):
+            return None
+
+        if (
+            header.get("version") != CHUNK_VERSION
+            or header.get("source") != {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+        ):
+            return None
+
+        return cls(chunk_path, header, len(CHUNK_MAGIC) + _LENGTH.size + header_size)
+
+    def iter_rows(self) -> Iterator[tuple[any, ...]]:
+        if not self.row_count:
+            return
+
+        with open(self.chunk_path, 'rb') as file:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                with memoryview(mapped) as buffer:
+                    with buffer[self._data_offset:] as data:
+                        offset, size = self._lengths
+
+                        with data[offset:offset + size] as lengths:
+                            row_lengths = lengths.cast('q').tolist()
+
+                        columns = [
+                            _decode_column(data, column, self.row_count)
+                            for column in self._columns
+                        ]
+
+        if not columns:
+            yield from (() for _ in row_lengths)
+            return
+
+        for length, row in zip(row_lengths, zip(*columns)):
+            yield row[:length]
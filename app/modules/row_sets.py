@@ -0,0 +1,37 @@
+from heapq import merge
+from typing import Iterable, Iterator, NamedTuple
+
+
+class RowSet(NamedTuple):
+    sort_key: tuple[int, int | float]
+    rows: tuple[tuple[any, ...], ...]
+
+    @property
+    def header_rows(self) -> tuple[tuple[any, ...], ...]:
+        return self.rows[:3]
+
+    @property
+    def value_rows(self) -> tuple[tuple[any, ...], ...]:
+        return self.rows[3:]
+
+
+def get_year_sort_key(year: any) -> tuple[int, int | float]:
+    if isinstance(year, (int, float)) and not isinstance(year, bool):
+        return (0, year)
+
+    # "-" and any other non-numeric year go after every real year
+    return (1, 0)
+
+
+def _iter_keyed_rows(row_set: RowSet) -> Iterator[tuple[tuple[int, int | float], tuple[any, ...]]]:
+    for row in row_set.value_rows:
+        yield row_set.sort_key, row
+
+
+def merge_row_sets(row_sets: Iterable[RowSet]) -> Iterator[tuple[any, ...]]:
+    # every row of a file shares its key, so this orders whole files by year and keeps
+    # files with the same year, and the rows within each file, in their original order
+    streams = [_iter_keyed_rows(row_set) for row_set in row_sets]
+
+    for _, row in merge(*streams, key=lambda keyed_row: keyed_row[0]):
+        yield row
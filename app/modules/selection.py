@@ -0,0 +1,73 @@
+from dataclasses import dataclass
+from typing import Iterable, Literal
+from .distributor_info import get_registry
+from .utils import normalize
+
+
+def _get_concession_key(concession_id: any) -> str:
+    if isinstance(concession_id, float) and concession_id.is_integer():
+        concession_id = int(concession_id)
+
+    return str(concession_id).strip()
+
+
+@dataclass(frozen=True)
+class Selection:
+    siglas: frozenset[str] | None = None
+    concession_ids: frozenset[str] | None = None
+    types: frozenset[Literal["Reajuste", "Revisão"]] | None = None
+    min_year: int | None = None
+    max_year: int | None = None
+
+    @classmethod
+    def create(
+        cls,
+        siglas: Iterable[str] | None = None,
+        concession_ids: Iterable[any] | None = None,
+        types: Iterable[Literal["Reajuste", "Revisão"]] | None = None,
+        min_year: int | None = None,
+        max_year: int | None = None
+    ) -> "Selection":
+        return cls(
+            siglas=frozenset(normalize(sigla) for sigla in siglas) if siglas else None,
+            concession_ids=frozenset(_get_concession_key(concession_id) for concession_id in concession_ids) if concession_ids else None,
+            types=frozenset(types) if types else None,
+            min_year=min_year,
+            max_year=max_year
+        )
+
+    @property
+    def has_year_range(self) -> bool:
+        return self.min_year is not None or self.max_year is not None
+
+    def includes_distributor(self, distributor: str) -> bool:
+        if self.siglas is not None and normalize(distributor) not in self.siglas:
+            return False
+
+        if self.concession_ids is not None:
+            concession_id = get_registry().get_column_info(
+                unknown_column_name="ID CONCESSÃO",
+                known_column_name="SIGLA",
+                known_value=distributor
+            )
+
+            if concession_id is None or _get_concession_key(concession_id) not in self.concession_ids:
+                return False
+
+        return True
+
+    def includes_type(self, type: Literal["Reajuste", "Revisão"]) -> bool:
+        return self.types is None or type in self.types
+
+    def includes_year(self, year: any) -> bool:
+        if not self.has_year_range:
+            return True
+
+        # files without a readable process date ("-") only pass when no year range is set
+        if not isinstance(year, int):
+            return False
+
+        return (
+            (self.min_year is None or year >= self.min_year)
+            and (self.max_year is None or year <= self.max_year)
+        )
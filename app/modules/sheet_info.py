@@ -1,6 +1,8 @@
 from openpyxl.worksheet.worksheet import Worksheet
 from openpyxl import Workbook
 from datetime import datetime
+from .profiling import count
+from .diagnostics import report
 
 
 def get_tab(tab_name: str, workbook: Workbook):
@@ -8,14 +10,17 @@ def get_tab(tab_name: str, workbook: Workbook):
         tab = workbook[tab_name]
         return tab
     except KeyError:
-        print(f"Erro: A aba {tab_name} não foi encontrada.")
+        report("missing_tab", f"Erro: A aba {tab_name} não foi encontrada.", sheet=tab_name)
         return None
     
 
 def get_value_at_coordinate(coordinate: str, tab: Worksheet):
+    count("cell_lookups")
     cell = tab[coordinate]
-    value = cell.value
+    return clean_value(cell.value)
 
+
+def clean_value(value: any):
     if "#REF!" in str(value):
         return None
     
@@ -0,0 +1,292 @@
+from openpyxl import Workbook
+from openpyxl.utils.cell import coordinate_from_string, column_index_from_string, get_column_letter
+from openpyxl.utils.exceptions import CellCoordinatesException
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from typing import Iterable, Mapping, NamedTuple
+from .profiling import count, span
+from .utils import normalize
+
+
+@dataclass(frozen=True)
+class SheetRequest:
+    rows: frozenset[int] = frozenset()
+    max_column: int = 1
+    scan_from: int | None = None
+
+    @property
+    def stop_row(self) -> int | None:
+        if self.scan_from is not None:
+            return None
+
+        return max(self.rows, default=0)
+
+    def covers(self, row: int, column: int) -> bool:
+        if column > self.max_column:
+            return False
+
+        return row in self.rows or (self.scan_from is not None and row >= self.scan_from)
+
+    def merge(self, other: "SheetRequest") -> "SheetRequest":
+        if self.scan_from is None:
+            scan_from = other.scan_from
+        elif other.scan_from is None:
+            scan_from = self.scan_from
+        else:
+            scan_from = min(self.scan_from, other.scan_from)
+
+        return SheetRequest(
+            rows=self.rows | other.rows,
+            max_column=max(self.max_column, other.max_column),
+            scan_from=scan_from
+        )
+
+
+def is_cell_coordinate(coordinate: str) -> bool:
+    # defined names can point at ranges or at #REF!, which aren't a single cell to read
+    try:
+        coordinate_from_string(coordinate)
+    except (CellCoordinatesException, ValueError):
+        return False
+
+    return True
+
+
+def sheet_request_from_coordinates(coordinates: Iterable[str], scan_from: int | None = None) -> SheetRequest:
+    cells = []
+
+    for coordinate in coordinates:
+        column_letter, row = coordinate_from_string(coordinate)
+        cells.append((row, column_index_from_string(column_letter)))
+
+    return SheetRequest(
+        rows=frozenset(row for row, _ in cells),
+        max_column=max((column for _, column in cells), default=1),
+        scan_from=scan_from
+    )
+
+
+def sheet_requests_from_cells(cells_by_tab: Mapping[str, Iterable[tuple[int, int]]]) -> dict[str, SheetRequest]:
+    requests = {}
+
+    for tab_name, cells in cells_by_tab.items():
+        cells = list(cells)
+
+        requests[tab_name] = SheetRequest(
+            rows=frozenset(row for row, _ in cells),
+            max_column=max((column for _, column in cells), default=1)
+        )
+
+    return requests
+
+
+def merge_sheet_requests(*all_requests: Mapping[str, SheetRequest]) -> dict[str, SheetRequest]:
+    merged = {}
+
+    for requests in all_requests:
+        for tab_name, request in requests.items():
+            if tab_name in merged:
+                merged[tab_name] = merged[tab_name].merge(request)
+            else:
+                merged[tab_name] = request
+
+    return merged
+
+
+class SnapshotCell(NamedTuple):
+    value: any
+    row: int
+    column: int
+
+    @property
+    def coordinate(self) -> str:
+        return f"{get_column_letter(self.column)}{self.row}"
+
+
+class SheetSnapshot:
+    def __init__(self, title: str, rows: dict[int, tuple], request: SheetRequest, max_row: int, worksheet=None):
+        self.title = title
+        self.request = request
+        self.max_row = max_row
+        self._rows = rows
+        self._worksheet = worksheet
+        self._label_indexes = {}
+
+    @classmethod
+    def capture(cls, worksheet, request: SheetRequest):
+        count("sheet_scans")
+
+        with span("sheet_capture", tab=worksheet.title):
+            return cls._capture(worksheet, request)
+
+    @classmethod
+    def _capture(cls, worksheet, request: SheetRequest):
+        rows = {}
+        max_row = 0
+
+        read_rows = getattr(worksheet, "read_rows", None)
+
+        if read_rows is not None:
+            rows, max_row = read_rows(request)
+            return cls(title=worksheet.title, rows=rows, request=request, max_row=max_row, worksheet=worksheet)
+
+        if request.stop_row == 0:
+            return cls(title=worksheet.title, rows=rows, request=request, max_row=max_row, worksheet=worksheet)
+
+        captured_rows = worksheet.iter_rows(
+            min_row=1,
+            max_row=request.stop_row,
+            max_col=request.max_column,
+            values_only=True
+        )
+
+        for row_index, values in enumerate(captured_rows, start=1):
+            max_row = row_index
+
+            if request.covers(row_index, 1) and any(value is not None for value in values):
+                rows[row_index] = tuple(values)
+
+        return cls(
+            title=worksheet.title,
+            rows=rows,
+            request=request,
+            max_row=max_row,
+            worksheet=worksheet
+        )
+
+    def get_value(self, row: int, column: int):
+        values = self._rows.get(row)
+
+        if values is None or column > len(values):
+            return None
+
+        return values[column - 1]
+
+    def get_label_index(self, column: int) -> dict[str, list[int]]:
+        label_index = self._label_indexes.get(column)
+
+        if label_index is None:
+            label_index = {}
+
+            for row in sorted(self._rows):
+                if row < self.request.scan_from:
+                    continue
+
+                value = self.get_value(row, column)
+
+                if isinstance(value, str):
+                    label_index.setdefault(normalize(value), []).append(row)
+
+            self._label_indexes[column] = label_index
+
+        return label_index
+
+    def find_label_rows(self, column: int, label: str, min_row: int, max_row: int | None = None) -> list[int] | None:
+        is_covered = (
+            self.request.scan_from is not None
+            and min_row >= self.request.scan_from
+            and column <= self.request.max_column
+        )
+
+        if not is_covered:
+            return None
+
+        rows = self.get_label_index(column).get(label, [])
+        start = bisect_left(rows, min_row)
+        end = len(rows) if max_row is None else bisect_right(rows, max_row)
+
+        return rows[start:end]
+
+    def __getitem__(self, coordinate: str) -> SnapshotCell:
+        column_letter, row = coordinate_from_string(coordinate)
+        column = column_index_from_string(column_letter)
+
+        if not self.request.covers(row, column) and self._worksheet is not None:
+            count("sheet_scans")
+            return SnapshotCell(self._worksheet[coordinate].value, row, column)
+
+        return SnapshotCell(self.get_value(row, column), row, column)
+
+    def iter_rows(
+        self,
+        min_row: int | None = None,
+        max_row: int | None = None,
+        min_col: int | None = None,
+        max_col: int | None = None,
+        values_only: bool = False
+    ):
+        min_row = min_row or 1
+        max_row = max_row or self.max_row
+        min_col = min_col or 1
+        max_col = max_col or self.request.max_column
+
+        is_covered = (
+            self.request.scan_from is not None
+            and min_row >= self.request.scan_from
+            and max_col <= self.request.max_column
+        )
+
+        if not is_covered and self._worksheet is not None:
+            count("sheet_scans")
+            yield from self._worksheet.iter_rows(
+                min_row=min_row,
+                max_row=max_row,
+                min_col=min_col,
+                max_col=max_col,
+                values_only=values_only
+            )
+            return
+
+        for row in range(min_row, max_row + 1):
+            if values_only:
+                yield tuple(self.get_value(row, column) for column in range(min_col, max_col + 1))
+            else:
+                yield tuple(
+                    SnapshotCell(self.get_value(row, column), row, column)
+                    for column in range(min_col, max_col + 1)
+                )
+
+
+class WorkbookSnapshot:
+    def __init__(
+        self,
+        workbook: Workbook,
+        requests: Mapping[str, SheetRequest],
+        sheets: Mapping[str, SheetSnapshot] | None = None
+    ):
+        self.workbook = workbook
+        self.requests = requests
+        self._sheets = dict(sheets or {})
+
+        for tab_name, sheet in self._sheets.items():
+            if sheet._worksheet is None and tab_name in workbook.sheetnames:
+                sheet._worksheet = workbook[tab_name]
+
+    @property
+    def sheetnames(self) -> list[str]:
+        return self.workbook.sheetnames
+
+    @property
+    def defined_names(self):
+        return self.workbook.defined_names
+
+    def __getitem__(self, tab_name: str) -> SheetSnapshot:
+        sheet = self._sheets.get(tab_name)
+
+        if sheet is None:
+            worksheet = self.workbook[tab_name]
+            request = self.requests.get(tab_name, SheetRequest())
+            sheet = SheetSnapshot.capture(worksheet, request)
+            self._sheets[tab_name] = sheet
+
+        return sheet
+
+    def __contains__(self, tab_name: str) -> bool:
+        return tab_name in self.workbook.sheetnames
+
+    def __repr__(self) -> str:
+        return repr(self.workbook)
+
+    def close(self):
+        self._sheets.clear()
+        self.workbook.close()
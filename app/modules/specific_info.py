@@ -2,11 +2,54 @@ from openpyxl import Workbook
 from openpyxl.utils.cell import coordinate_from_string, column_index_from_string, get_column_letter
 from typing import Literal
 from .cover_info import get_value_at_coordinate
+from .sheet_info import clean_value
+from .extraction_plan import OMPlan
+from .sheet_snapshot import SheetRequest, SheetSnapshot, sheet_request_from_coordinates
+from .profiling import count, traced
 from .utils import normalize
 import os
 
 
+OM_FIRST_ROW = 7
+OM_SECTION_COLUMN = 10
+OM_SUB_ITEM_COLUMN = 11
+OM_SECTION_SPAN = 32
 
+SHEET_REQUESTS = {
+    "UDEROR": sheet_request_from_coordinates(['C2', 'C6', 'C7']),
+    "VPB e Fator X": SheetRequest(max_column=4, scan_from=160),
+    "VPB1": SheetRequest(max_column=3, scan_from=36),
+    "Resultado": SheetRequest(max_column=4, scan_from=30),
+    "Mercado": sheet_request_from_coordinates(['H38']),
+    "BD": sheet_request_from_coordinates(['M63']),
+    "Entrada": SheetRequest(max_column=13, scan_from=7)
+}
+
+
+def _find_label_rows(tab: any, column: int, label: str, min_row: int, max_row: int | None = None) -> list[int]:
+    count("label_searches")
+
+    if isinstance(tab, SheetSnapshot):
+        rows = tab.find_label_rows(column, label, min_row, max_row)
+
+        if rows is not None:
+            return rows
+
+    rows = []
+
+    for row_index, row in enumerate(
+        tab.iter_rows(min_row=min_row, max_row=max_row, min_col=column, max_col=column, values_only=True),
+        start=min_row
+    ):
+        value = row[0] if row else None
+
+        if isinstance(value, str) and normalize(value) == label:
+            rows.append(row_index)
+
+    return rows
+
+
+@traced()
 def _get_detailed_info(
     workbook: Workbook,
     default_tab_name: str,
@@ -33,57 +76,36 @@ def _get_detailed_info(
         tab = workbook[alternate_tab_name]
     except Exception:
         return None
-    
-    first_coordinates = []
-    first_coordinate = ""
-    second_coordinates = []
-    second_coordinate = ""
-
-    for row in tab.iter_rows(min_row=min_row, min_col=first_column_index, max_col=first_column_index):
-        for cell in row:
-            value = cell.value
 
-            if isinstance(value, str) and normalize(value) == target_value:
-                first_coordinates.append(cell.coordinate)
-
-    first_coordinates = sorted(
-        first_coordinates,
-        key=lambda coordinate: coordinate_from_string(coordinate)[1]
+    first_rows = _find_label_rows(
+        tab=tab,
+        column=first_column_index,
+        label=target_value,
+        min_row=min_row
     )
 
-    if len(first_coordinates) > 0:
-        first_coordinate = first_coordinates[first_coordinate_index]
+    if len(first_rows) > 0:
+        first_row_index = first_rows[first_coordinate_index]
     else:
         return
-    
-    _, first_row_index = coordinate_from_string(first_coordinate)
-    max_row = first_row_index + offset_to_max_row
-
-    for row in tab.iter_rows(min_row=first_row_index, max_row=max_row, min_col=second_column_index, max_col=second_column_index):
-        for cell in row:
-            value = cell.value
 
-            if isinstance(value, str) and normalize(value) == second_target_value:
-                second_coordinates.append(cell.coordinate)
-                break
+    max_row = first_row_index + offset_to_max_row
 
-    second_coordinates = sorted(
-        second_coordinates,
-        key=lambda coordinate: coordinate_from_string(coordinate)[1]
+    second_rows = _find_label_rows(
+        tab=tab,
+        column=second_column_index,
+        label=second_target_value,
+        min_row=first_row_index,
+        max_row=max_row
     )
 
-    if len(second_coordinates) > 0:
-        second_coordinate = second_coordinates[second_coordinate_index]
+    if len(second_rows) > 0:
+        second_row_index = second_rows[second_coordinate_index]
     else:
         return
-    
-    second_column_letter, second_row_index = coordinate_from_string(second_coordinate)
-    second_column_index = column_index_from_string(second_column_letter)
 
-    second_column_index += column_offset
-    second_column_letter = get_column_letter(second_column_index)
-    
-    value_coordinate = f"{second_column_letter}{second_row_index}"
+    value_column_letter = get_column_letter(second_column_index + column_offset)
+    value_coordinate = f"{value_column_letter}{second_row_index}"
 
     return get_value_at_coordinate(value_coordinate, tab)
 
@@ -298,6 +320,7 @@ def _get_pb_info(
     )
 
 
+@traced()
 def get_specific_info(
     workbook: Workbook,
     contract_type: str,
@@ -383,6 +406,54 @@ def _get_t1_and_t2_dict(workbook: Workbook):
     return t1_and_t2
 
 
+def _get_OM_values(
+    tab: any,
+    OM_plan: OMPlan,
+    t_column_indexes: list[int]
+) -> dict[tuple[int, int, int], any]:
+    rows = {}
+    section_rows = {}
+    max_column = max(t_column_indexes + [OM_SUB_ITEM_COLUMN])
+
+    for row_index, row in enumerate(
+        tab.iter_rows(min_row=OM_FIRST_ROW, max_col=max_column, values_only=True),
+        start=OM_FIRST_ROW
+    ):
+        rows[row_index] = row
+        section_label = row[OM_SECTION_COLUMN - 1]
+
+        if isinstance(section_label, str):
+            section_rows.setdefault(normalize(section_label), row_index)
+
+    values = {}
+
+    for i, target_value in enumerate(OM_plan.section_labels):
+        section_row = section_rows.get(target_value)
+
+        if section_row is None:
+            continue
+
+        sub_item_rows = {}
+
+        for row_index in range(section_row, section_row + OM_SECTION_SPAN + 1):
+            row = rows.get(row_index)
+            sub_item_label = row[OM_SUB_ITEM_COLUMN - 1] if row else None
+
+            if isinstance(sub_item_label, str):
+                sub_item_rows.setdefault(normalize(sub_item_label), row_index)
+
+        for j, sub_item_label in enumerate(OM_plan.sub_item_labels[i]):
+            row_index = sub_item_rows.get(sub_item_label)
+
+            if row_index is None:
+                continue
+
+            for t, column_index in enumerate(t_column_indexes):
+                values[(t, i, j)] = clean_value(rows[row_index][column_index - 1])
+
+    return values
+
+
 def _get_t_column_index(t: int, t_coordinates: list[str]):
     t1_coordinate = t_coordinates[0]
     t2_coordinate = t_coordinates[1]
@@ -392,14 +463,15 @@ def _get_t_column_index(t: int, t_coordinates: list[str]):
     return column_index_from_string(t_column_letter)
 
 
+@traced()
 def get_real_OM_headers(
     workbook: Workbook,
-    json_data: any,
+    OM_plan: OMPlan,
     type: Literal["Reajuste", "Revisão"]
 ):
-    base_name = json_data['base_name']
-    items = json_data['items']
-    sub_items = json_data['sub_items']
+    base_name = OM_plan.base_name
+    items = OM_plan.items
+    sub_items = OM_plan.sub_items
 
     t1_and_t2_dict = _get_t1_and_t2_dict(workbook)
 
@@ -422,6 +494,13 @@ def get_real_OM_headers(
     third_header = []
     values = []
 
+    if not is_empty:
+        OM_values = _get_OM_values(
+            tab=workbook["Entrada"],
+            OM_plan=OM_plan,
+            t_column_indexes=[_get_t_column_index(t, coordinates) for t in range(2)]
+        )
+
     for t in range(2):
         t_text = "t-1" if t == 0 else "t-2"
 
@@ -444,26 +523,7 @@ def get_real_OM_headers(
 
                 t_year = t1_year if t == 0 else t2_year
 
-                target_value = normalize(main_item) if i == len(items) - 1 else f"CONTA {normalize(main_item)}"
-                t_column_index = _get_t_column_index(t, coordinates)
-
-                value = (t_year if (i == 0 and j == 0) else
-                    _get_detailed_info(
-                        workbook=workbook,
-                        default_tab_name="",
-                        default_coordinate="",
-                        alternate_tab_name="Entrada",
-                        min_row=7,
-                        offset_to_max_row=32,
-                        first_column_index=10,
-                        second_column_index=11,
-                        target_value=target_value,
-                        second_target_value=normalize(minor_item),
-                        column_offset=t_column_index - 11
-                    )
-                )
-
-                values.append(value)
+                values.append(t_year if (i == 0 and j == 0) else OM_values.get((t, i, j)))
 
     return [
         first_header,
@@ -0,0 +1,126 @@
+from datetime import date, datetime, time
+from typing import Iterable
+import sqlite3
+
+
+SQLITE_NAME = "BANCO.sqlite"
+
+FIXED_COLUMN_NAMES = {
+    "SIGLA": "sigla",
+    "NOME": "nome",
+    "AGENTE": "agente",
+    "ID CONCESSÃO": "id_concessao",
+    "CÓDIGO": "codigo",
+    "ID AGENTE": "id_agente",
+    "Ano": "ano",
+    "Contrato": "contrato",
+    "Tipo de Processo": "tipo_processo"
+}
+
+INDEXED_COLUMNS = ("sigla", "id_concessao", "ano", "contrato", "tipo_processo")
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS colunas (
+    indice INTEGER PRIMARY KEY,
+    nivel_1 TEXT,
+    nivel_2 TEXT,
+    nivel_3 TEXT
+);
+
+CREATE TABLE IF NOT EXISTS processos (
+    id INTEGER PRIMARY KEY,
+    {", ".join(FIXED_COLUMN_NAMES.values())}
+);
+
+CREATE TABLE IF NOT EXISTS valores (
+    processo_id INTEGER NOT NULL REFERENCES processos(id) ON DELETE CASCADE,
+    coluna INTEGER NOT NULL REFERENCES colunas(indice),
+    valor,
+    PRIMARY KEY (processo_id, coluna)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS valores_coluna ON valores (coluna);
+
+{"".join(f"CREATE INDEX IF NOT EXISTS processos_{name} ON processos ({name});" for name in INDEXED_COLUMNS)}
+"""
+
+
+def _to_sql_value(value: any) -> any:
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+
+    return value
+
+
+class SQLiteSink:
+    def __init__(self, path: str):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA foreign_keys = ON")
+        self.connection.execute("PRAGMA journal_mode = WAL")
+        self.connection.executescript(SCHEMA)
+
+    def get_distributors(self) -> set[str]:
+        return {
+            sigla for (sigla,) in
+            self.connection.execute("SELECT DISTINCT sigla FROM processos")
+        }
+
+    def _write_header(self, header_rows: tuple[tuple[any, ...], ...]):
+        levels = list(zip(*(row for row in header_rows[:3])))
+
+        self.connection.executemany(
+            "INSERT INTO colunas (indice, nivel_1, nivel_2, nivel_3) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (indice) DO UPDATE SET "
+            "nivel_1 = excluded.nivel_1, nivel_2 = excluded.nivel_2, nivel_3 = excluded.nivel_3",
+            [
+                (index, *(_to_sql_value(level) for level in column_levels))
+                for index, column_levels in enumerate(levels, start=1)
+            ]
+        )
+
+    def delete_distributor(self, distributor: str):
+        with self.connection:
+            self.connection.execute("DELETE FROM processos WHERE sigla = ?", (distributor,))
+
+    def replace_distributors(
+        self,
+        header_rows: tuple[tuple[any, ...], ...],
+        rows_by_distributor: dict[str, Iterable[tuple[any, ...]]]
+    ):
+        fixed_columns = header_rows[2][:len(FIXED_COLUMN_NAMES)]
+        column_names = [FIXED_COLUMN_NAMES[column] for column in fixed_columns]
+        insert_process = (
+            f"INSERT INTO processos ({', '.join(column_names)}) "
+            f"VALUES ({', '.join('?' for _ in column_names)})"
+        )
+
+        with self.connection:
+            self._write_header(header_rows)
+
+            for distributor, rows in rows_by_distributor.items():
+                self.connection.execute("DELETE FROM processos WHERE sigla = ?", (distributor,))
+
+                for row in rows:
+                    cursor = self.connection.execute(
+                        insert_process,
+                        [_to_sql_value(value) for value in row[:len(column_names)]]
+                    )
+
+                    self.connection.executemany(
+                        "INSERT INTO valores (processo_id, coluna, valor) VALUES (?, ?, ?)",
+                        [
+                            (cursor.lastrowid, index, _to_sql_value(value))
+                            for index, value in enumerate(row, start=1)
+                            if index > len(column_names) and value is not None
+                        ]
+                    )
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
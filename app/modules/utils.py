@@ -1,3 +1,4 @@
+from functools import lru_cache
 from pathlib import Path
 import unicodedata
 import json
@@ -8,18 +9,45 @@ def get_suffix(file_name: str) -> str:
     return path.suffix
 
 
-def normalize(text: str) -> str:
-    if not isinstance(text, str):
-        return ""
-    
-    text = text.strip().upper()
+NORMALIZE_CACHE_SIZE = 65536
+
 
+def _strip_marks(text: str) -> str:
     return ''.join(
         c for c in unicodedata.normalize('NFD', text)
         if unicodedata.category(c) != 'Mn'
     )
 
 
+# Latin-1 has no combining marks of its own, so stripping them character by
+# character gives exactly what the full NFD pass gives for the whole string
+LATIN_1_TABLE = str.maketrans({
+    chr(code): _strip_marks(chr(code))
+    for code in range(0x80, 0x100)
+    if _strip_marks(chr(code)) != chr(code)
+})
+
+
+@lru_cache(maxsize=NORMALIZE_CACHE_SIZE)
+def _normalize_text(text: str) -> str:
+    text = text.strip().upper()
+
+    if text.isascii():
+        return text
+
+    if max(text) <= '\xff':
+        return text.translate(LATIN_1_TABLE)
+
+    return _strip_marks(text)
+
+
+def normalize(text: str) -> str:
+    if not isinstance(text, str):
+        return ""
+
+    return _normalize_text(text)
+
+
 def get_json_data(json_path: str):
     with open(json_path, 'r', encoding='utf-8') as file:
         json_data = json.load(file)
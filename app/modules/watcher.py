@@ -0,0 +1,200 @@
+from concurrent.futures import ProcessPoolExecutor
+from time import monotonic
+from typing import Iterable
+from .bank_files import get_base_path
+from .data import process_data_bases, process_distributors
+from .distributor_info import get_registry
+from .extraction_plan import get_OM_plan, get_extraction_plan
+from .selection import Selection
+import threading
+import signal
+import zipfile
+import os
+
+
+POLL_SECONDS = 5.0
+OBSERVER_POLL_SECONDS = 60.0
+SETTLE_SECONDS = 3.0
+
+PROCESS_TYPES = ("Reajuste", "Revisão")
+
+
+def _warm_up():
+    get_registry()
+    get_extraction_plan()
+    get_OM_plan()
+
+
+def _init_worker():
+    # Ctrl+C reaches the whole process group; only the daemon itself should handle it
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    _warm_up()
+
+
+def _get_pool(workers: int) -> ProcessPoolExecutor | None:
+    if workers <= 1:
+        return None
+
+    return ProcessPoolExecutor(max_workers=workers, initializer=_init_worker)
+
+
+def _start_observer(distributors_path: str, wake: threading.Event):
+    try:
+        from watchdog.events import FileSystemEventHandler
+        from watchdog.observers import Observer
+    except ImportError:
+        return None
+
+    class WakeHandler(FileSystemEventHandler):
+        def on_any_event(self, event):
+            wake.set()
+
+    observer = Observer()
+    observer.schedule(WakeHandler(), distributors_path, recursive=True)
+    observer.start()
+
+    return observer
+
+
+def scan_tree(distributors_path: str) -> dict[str, tuple[int, int]]:
+    files = {}
+
+    for distributor in os.listdir(distributors_path):
+        for type in PROCESS_TYPES:
+            type_path = os.path.join(distributors_path, distributor, type)
+
+            if not os.path.isdir(type_path):
+                continue
+
+            for entry in os.scandir(type_path):
+                name = entry.name
+
+                if (
+                    (name.endswith(".xlsx") or name.endswith(".xlsm"))
+                    and not name.startswith("~$")
+                    and entry.is_file()
+                ):
+                    stat = entry.stat()
+                    files[entry.path] = (stat.st_size, stat.st_mtime_ns)
+
+    return files
+
+
+def _get_distributor(distributors_path: str, file_path: str) -> str:
+    return os.path.relpath(file_path, distributors_path).split(os.sep)[0]
+
+
+def _is_complete(file_path: str, stat_key: tuple[int, int] | None) -> bool:
+    # a workbook still being copied has no central directory yet
+    return stat_key is None or zipfile.is_zipfile(file_path)
+
+
+def _update_banks(
+    base_path: str,
+    workers: int,
+    executor: ProcessPoolExecutor | None,
+    selection: Selection | None,
+    description: str
+):
+    try:
+        process_distributors(
+            workers=workers,
+            base_path=base_path,
+            selection=selection,
+            executor=executor
+        )
+        process_data_bases(base_path=base_path)
+    except Exception as error:
+        # the daemon keeps watching; the next change to these files retries them
+        print(f"\nFalha ao atualizar {description}: {str(error)}")
+
+
+def _process_changes(
+    distributors_path: str,
+    base_path: str,
+    file_paths: Iterable[str],
+    workers: int,
+    executor: ProcessPoolExecutor | None
+):
+    distributors = sorted({_get_distributor(distributors_path, file_path) for file_path in file_paths})
+
+    print(f"\nAlterações em {', '.join(distributors)}")
+
+    _update_banks(base_path, workers, executor, Selection.create(siglas=distributors), ", ".join(distributors))
+
+
+def watch(
+    workers: int = 1,
+    poll_seconds: float = POLL_SECONDS,
+    settle_seconds: float = SETTLE_SECONDS,
+    use_observer: bool = True,
+    base_path: str | None = None
+):
+    base_path = get_base_path(base_path)
+    distributors_path = os.path.join(base_path, "Distribuidoras")
+
+    _warm_up()
+    executor = _get_pool(workers)
+
+    wake = threading.Event()
+    observer = _start_observer(distributors_path, wake) if use_observer else None
+
+    if observer is None:
+        if use_observer:
+            print("\nO pacote 'watchdog' não está instalado (pip install watchdog); usando varredura periódica")
+
+        print(f"\nObservando {distributors_path} (varredura a cada {poll_seconds:g}s). Ctrl+C para sair.")
+    else:
+        # the observer only wakes the loop; a slow scan still catches anything it misses
+        poll_seconds = max(poll_seconds, OBSERVER_POLL_SECONDS)
+        print(f"\nObservando {distributors_path} (eventos do sistema de arquivos). Ctrl+C para sair.")
+
+    known_files = scan_tree(distributors_path)
+    pending_files = {}
+
+    try:
+        # anything added, changed or removed while the daemon was down is caught up first;
+        # the manifest keeps this pass to the files that actually changed
+        print("\nAtualizando os bancos com as alterações feitas desde a última execução")
+        _update_banks(base_path, workers, executor, None, "os bancos de dados")
+        print(f"\nObservando {distributors_path}...")
+
+        while True:
+            wake.wait(timeout=min(poll_seconds, settle_seconds) if pending_files else poll_seconds)
+            wake.clear()
+
+            now = monotonic()
+            current_files = scan_tree(distributors_path)
+
+            for file_path in known_files.keys() | current_files.keys():
+                stat_key = current_files.get(file_path)
+
+                if stat_key != known_files.get(file_path):
+                    pending_files[file_path] = (stat_key, now)
+
+            known_files = current_files
+            ready_files = []
+
+            for file_path, (stat_key, changed_at) in list(pending_files.items()):
+                if now - changed_at < settle_seconds:
+                    continue
+
+                if not _is_complete(file_path, stat_key):
+                    pending_files[file_path] = (stat_key, now)
+                    continue
+
+                ready_files.append(file_path)
+                del pending_files[file_path]
+
+            if ready_files:
+                _process_changes(distributors_path, base_path, ready_files, workers, executor)
+                print(f"\nObservando {distributors_path}...")
+    except KeyboardInterrupt:
+        print("\nEncerrando o modo de observação")
+    finally:
+        if observer is not None:
+            observer.stop()
+            observer.join()
+
+        if executor:
+            executor.shutdown(cancel_futures=True)
@@ -0,0 +1,383 @@
+from openpyxl.styles.numbers import BUILTIN_FORMATS, is_date_format, is_timedelta_format
+from openpyxl.utils.cell import coordinate_from_string, column_index_from_string, range_boundaries
+from openpyxl.utils.datetime import CALENDAR_MAC_1904, CALENDAR_WINDOWS_1900, from_excel, from_ISO8601
+from xml.etree.ElementTree import iterparse
+from posixpath import dirname, join, normpath
+from .sheet_snapshot import SheetRequest, SnapshotCell, is_cell_coordinate
+from .profiling import count
+from typing import NamedTuple
+import zipfile
+
+
+MAIN_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+REL_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+PACKAGE_REL_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+
+SHARED_STRINGS_TYPE = f"{REL_NS}/sharedStrings"
+STYLES_TYPE = f"{REL_NS}/styles"
+
+DIMENSION_TAG = f"{{{MAIN_NS}}}dimension"
+ROW_TAG = f"{{{MAIN_NS}}}row"
+CELL_TAG = f"{{{MAIN_NS}}}c"
+VALUE_TAG = f"{{{MAIN_NS}}}v"
+TEXT_TAG = f"{{{MAIN_NS}}}t"
+RUN_TAG = f"{{{MAIN_NS}}}r"
+INLINE_STRING_TAG = f"{{{MAIN_NS}}}is"
+STRING_ITEM_TAG = f"{{{MAIN_NS}}}si"
+
+
+def _get_text_content(element) -> str:
+    snippets = []
+
+    for child in element:
+        if child.tag == TEXT_TAG and child.text is not None:
+            snippets.append(child.text)
+        elif child.tag == RUN_TAG:
+            text = child.findtext(TEXT_TAG)
+
+            if text is not None:
+                snippets.append(text)
+
+    return "".join(snippets)
+
+
+def _cast_number(value: str) -> int | float:
+    if "." in value or "E" in value or "e" in value:
+        return float(value)
+
+    return int(value)
+
+
+def _resolve_target(base_path: str, target: str) -> str:
+    if target.startswith("/"):
+        return target[1:]
+
+    return normpath(join(dirname(base_path), target))
+
+
+def _open_part(archive: zipfile.ZipFile, path: str):
+    count("bytes_read", archive.getinfo(path).compress_size)
+    return archive.open(path)
+
+
+def _split_destination(destination: str) -> tuple[str, str] | None:
+    if "!" not in destination:
+        return None
+
+    tab_name, cell_ref = destination.rsplit("!", 1)
+
+    if tab_name.startswith("'") and tab_name.endswith("'"):
+        tab_name = tab_name[1:-1].replace("''", "'")
+
+    if not tab_name or not is_cell_coordinate(cell_ref):
+        return None
+
+    return tab_name, cell_ref
+
+
+class XlsxDefinedName(NamedTuple):
+    name: str
+    destinations: tuple[tuple[str, str], ...]
+
+
+class SharedStrings:
+    def __init__(self, archive: zipfile.ZipFile, path: str | None):
+        self._archive = archive
+        self._path = path
+        self._strings = []
+        self._items = None
+
+    def _iter_items(self):
+        with _open_part(self._archive, self._path) as source:
+            for _, element in iterparse(source):
+                if element.tag == STRING_ITEM_TAG:
+                    yield _get_text_content(element).replace('x005F_', '')
+                    element.clear()
+
+    def __getitem__(self, index: int) -> str:
+        if self._path is None:
+            raise IndexError(index)
+
+        if self._items is None:
+            self._items = self._iter_items()
+
+        while len(self._strings) <= index:
+            text = next(self._items, None)
+
+            if text is None:
+                raise IndexError(index)
+
+            self._strings.append(text)
+
+        return self._strings[index]
+
+
+class XlsxArchive:
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        self._archive = zipfile.ZipFile(file_path)
+        self._sheet_paths = {}
+        self.defined_names = {}
+        self.epoch = CALENDAR_WINDOWS_1900
+
+        self._read_workbook()
+
+        self.shared_strings = SharedStrings(self._archive, self._part_paths.get(SHARED_STRINGS_TYPE))
+        self._date_styles = None
+
+    def _get_workbook_path(self) -> str:
+        with _open_part(self._archive, "_rels/.rels") as source:
+            for _, element in iterparse(source):
+                if element.tag == f"{{{PACKAGE_REL_NS}}}Relationship" and element.get("Type").endswith("/officeDocument"):
+                    return _resolve_target("", element.get("Target"))
+
+        return "xl/workbook.xml"
+
+    def _read_workbook(self):
+        workbook_path = self._get_workbook_path()
+        rels_path = join(dirname(workbook_path), "_rels", f"{workbook_path.rsplit('/', 1)[-1]}.rels")
+
+        targets = {}
+        self._part_paths = {}
+
+        with _open_part(self._archive, rels_path) as source:
+            for _, element in iterparse(source):
+                if element.tag == f"{{{PACKAGE_REL_NS}}}Relationship":
+                    target = _resolve_target(workbook_path, element.get("Target"))
+                    targets[element.get("Id")] = target
+                    self._part_paths.setdefault(element.get("Type"), target)
+
+        sheet_ids = []
+
+        with _open_part(self._archive, workbook_path) as source:
+            for _, element in iterparse(source):
+                if element.tag == f"{{{MAIN_NS}}}sheet":
+                    tab_name = element.get("name")
+                    self._sheet_paths[tab_name] = targets.get(element.get(f"{{{REL_NS}}}id"))
+                    sheet_ids.append(tab_name)
+                elif element.tag == f"{{{MAIN_NS}}}workbookPr":
+                    if element.get("date1904") in ("1", "true"):
+                        self.epoch = CALENDAR_MAC_1904
+                elif element.tag == f"{{{MAIN_NS}}}definedName":
+                    if element.get("localSheetId") is None and element.text:
+                        destinations = [
+                            _split_destination(destination.strip())
+                            for destination in element.text.split(",")
+                        ]
+                        self.defined_names[element.get("name")] = XlsxDefinedName(
+                            name=element.get("name"),
+                            destinations=tuple(destination for destination in destinations if destination)
+                        )
+
+        self.sheetnames = sheet_ids
+
+    def _get_date_styles(self) -> tuple[set[int], set[int]]:
+        if self._date_styles is not None:
+            return self._date_styles
+
+        date_styles = set()
+        timedelta_styles = set()
+        styles_path = self._part_paths.get(STYLES_TYPE)
+
+        if styles_path:
+            custom_formats = {}
+            style_formats = []
+            in_cell_xfs = False
+
+            with _open_part(self._archive, styles_path) as source:
+                for event, element in iterparse(source, events=("start", "end")):
+                    if element.tag == f"{{{MAIN_NS}}}cellXfs":
+                        in_cell_xfs = event == "start"
+                    elif event == "end" and element.tag == f"{{{MAIN_NS}}}numFmt":
+                        custom_formats[int(element.get("numFmtId"))] = element.get("formatCode")
+                    elif event == "end" and element.tag == f"{{{MAIN_NS}}}xf" and in_cell_xfs:
+                        style_formats.append(int(element.get("numFmtId", 0)))
+
+            for style_id, format_id in enumerate(style_formats):
+                format_code = custom_formats.get(format_id, BUILTIN_FORMATS.get(format_id))
+
+                if format_code and is_date_format(format_code):
+                    date_styles.add(style_id)
+
+                if format_code and is_timedelta_format(format_code):
+                    timedelta_styles.add(style_id)
+
+        self._date_styles = (date_styles, timedelta_styles)
+        return self._date_styles
+
+    def _parse_value(self, element) -> any:
+        data_type = element.get("t", "n")
+
+        if data_type == "inlineStr":
+            child = element.find(INLINE_STRING_TAG)
+            return _get_text_content(child) if child is not None else None
+
+        value = element.findtext(VALUE_TAG) or None
+
+        if value is None:
+            return None
+
+        if data_type == "n":
+            value = _cast_number(value)
+            style_id = int(element.get("s", 0))
+            date_styles, timedelta_styles = self._get_date_styles()
+
+            if style_id in date_styles:
+                try:
+                    return from_excel(value, self.epoch, timedelta=style_id in timedelta_styles)
+                except (OverflowError, ValueError):
+                    return "#VALUE!"
+
+            return value
+
+        if data_type == "s":
+            return self.shared_strings[int(value)]
+
+        if data_type == "b":
+            return bool(int(value))
+
+        if data_type == "d":
+            return from_ISO8601(value)
+
+        return value
+
+    def read_sheet(
+        self,
+        tab_name: str,
+        request: SheetRequest,
+        max_row: int | None = None
+    ) -> tuple[dict[int, tuple], int]:
+        sheet_path = self._sheet_paths.get(tab_name)
+
+        if sheet_path is None:
+            raise KeyError(f"Worksheet {tab_name} does not exist.")
+
+        # same row limit as openpyxl: an explicit stop row, otherwise the sheet dimension
+        limit = request.stop_row if request.stop_row is not None else max_row
+        rows = {}
+        last_row = 0
+
+        if limit == 0:
+            return rows, last_row
+
+        current_row = 0
+        current_values = None
+        column_counter = 0
+
+        with _open_part(self._archive, sheet_path) as source:
+            for event, element in iterparse(source, events=("start", "end")):
+                if element.tag == ROW_TAG:
+                    if event == "start":
+                        row_index = element.get("r")
+                        current_row = int(row_index) if row_index else current_row + 1
+                        column_counter = 0
+
+                        if limit is not None and current_row > limit:
+                            last_row = limit
+                            break
+
+                        is_covered = request.covers(current_row, 1)
+                        current_values = [None] * request.max_column if is_covered else None
+                    else:
+                        last_row = current_row
+
+                        if current_values is not None and any(value is not None for value in current_values):
+                            rows[current_row] = tuple(current_values)
+
+                        current_values = None
+                        element.clear()
+                elif element.tag == CELL_TAG and event == "end":
+                    if current_values is None:
+                        element.clear()
+                        continue
+
+                    coordinate = element.get("r")
+
+                    if coordinate:
+                        column_letter, _ = coordinate_from_string(coordinate)
+                        column_counter = column_index_from_string(column_letter)
+                    else:
+                        column_counter += 1
+
+                    if column_counter <= request.max_column:
+                        current_values[column_counter - 1] = self._parse_value(element)
+
+                    element.clear()
+                elif element.tag == DIMENSION_TAG and event == "end" and limit is None:
+                    limit = self._get_dimension_row(element.get("ref"))
+
+        return rows, last_row
+
+    def _get_dimension_row(self, ref: str | None) -> int | None:
+        try:
+            return range_boundaries(ref)[3]
+        except (TypeError, ValueError):
+            return None
+
+    def __getitem__(self, tab_name: str) -> "XlsxWorksheet":
+        if tab_name not in self._sheet_paths:
+            raise KeyError(f"Worksheet {tab_name} does not exist.")
+
+        return XlsxWorksheet(archive=self, title=tab_name)
+
+    def __contains__(self, tab_name: str) -> bool:
+        return tab_name in self._sheet_paths
+
+    def __repr__(self) -> str:
+        return f"<XlsxArchive {self.file_path}>"
+
+    def close(self):
+        self._archive.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class XlsxWorksheet:
+    def __init__(self, archive: XlsxArchive, title: str):
+        self.archive = archive
+        self.title = title
+
+    def read_rows(self, request: SheetRequest) -> tuple[dict[int, tuple], int]:
+        return self.archive.read_sheet(self.title, request)
+
+    def __getitem__(self, coordinate: str) -> SnapshotCell:
+        column_letter, row = coordinate_from_string(coordinate)
+        column = column_index_from_string(column_letter)
+
+        rows, _ = self.read_rows(SheetRequest(rows=frozenset([row]), max_column=column))
+        values = rows.get(row, ())
+
+        return SnapshotCell(values[column - 1] if values else None, row, column)
+
+    def iter_rows(
+        self,
+        min_row: int | None = None,
+        max_row: int | None = None,
+        min_col: int | None = None,
+        max_col: int | None = None,
+        values_only: bool = False
+    ):
+        min_row = min_row or 1
+        min_col = min_col or 1
+        max_col = max_col or min_col
+
+        rows, last_row = self.archive.read_sheet(
+            self.title,
+            SheetRequest(max_column=max_col, scan_from=min_row),
+            max_row=max_row
+        )
+
+        for row in range(min_row, last_row + 1):
+            values = rows.get(row, (None,) * max_col)[min_col - 1:max_col]
+
+            if values_only:
+                yield values
+            else:
+                yield tuple(
+                    SnapshotCell(value, row, column)
+                    for column, value in enumerate(values, start=min_col)
+                )
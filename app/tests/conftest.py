@@ -0,0 +1,25 @@
+import warnings
+import shutil
+import sys
+import os
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+warnings.filterwarnings("ignore", category=UserWarning, module="openpyxl")
+
+from benchmarks.generator import generate_tree
+
+
+@pytest.fixture(scope="session")
+def generated_tree(tmp_path_factory) -> str:
+    base_path = tmp_path_factory.mktemp("generated")
+    generate_tree(base_path=str(base_path), distributors=3, files_per_distributor=4, seed=7)
+    return str(base_path)
+
+
+@pytest.fixture
+def base_path(generated_tree, tmp_path) -> str:
+    base_path = str(tmp_path / "base")
+    shutil.copytree(generated_tree, base_path)
+    return base_path
@@ -0,0 +1,62 @@
+from openpyxl import load_workbook
+from openpyxl.workbook.defined_name import DefinedName
+from benchmarks.generator import _get_distributors, generate_workbook
+from modules.cover_info import PROCESS_DATE_NAME, get_process_date_requests, read_process_year
+from modules.data import FileJob, _extract_file
+from modules.extraction_plan import get_extraction_plan
+from modules.xlsx_reader import XlsxArchive
+import random
+import pytest
+
+
+@pytest.fixture(params=["#REF!", "CAPA!#REF!", "CAPA!$C$10:$C$11"])
+def broken_name_file(request, tmp_path):
+    sigla, concession_id = _get_distributors(1)[0]
+    file_path = str(tmp_path / "processo.xlsx")
+
+    generate_workbook(
+        file_path=file_path,
+        concession_id=concession_id,
+        process_year=2021,
+        type="Reajuste",
+        contract_type="Novo",
+        rng=random.Random(0),
+        with_defined_name=False
+    )
+
+    workbook = load_workbook(file_path)
+    workbook["CAPA"]["C11"] = "não é a data do processo"
+    workbook.defined_names[PROCESS_DATE_NAME] = DefinedName(PROCESS_DATE_NAME, attr_text=request.param)
+    workbook.save(file_path)
+
+    return sigla, file_path
+
+
+def test_broken_defined_name_requests_nothing(broken_name_file):
+    _, file_path = broken_name_file
+
+    with XlsxArchive(file_path) as archive:
+        assert get_process_date_requests(archive) == {}
+
+    workbook = load_workbook(file_path, read_only=True)
+
+    try:
+        assert get_process_date_requests(workbook) == {}
+    finally:
+        workbook.close()
+
+
+def test_broken_defined_name_falls_back_to_cover(broken_name_file):
+    _, file_path = broken_name_file
+
+    assert read_process_year(file_path) == 2021
+
+
+@pytest.mark.parametrize("backend", ["xlsx", "openpyxl"])
+def test_broken_defined_name_keeps_file(broken_name_file, backend):
+    sigla, file_path = broken_name_file
+
+    result = _extract_file(FileJob(distributor=sigla, type="Reajuste", file_path=file_path), backend=backend)
+
+    assert result.error is None
+    assert result.row_set.rows[3][get_extraction_plan().fixed_columns.index("Ano")] == 2021
@@ -0,0 +1,323 @@
+from functools import partial
+from openpyxl import load_workbook
+from main import _get_parser
+from modules import data
+from modules.data import TEMP_FOLDER, process_data_bases, process_distributors
+from modules.diagnostics import read_report
+from modules.manifest import JOURNAL_NAME, Manifest
+from modules.profiling import FILE_SPAN, PROFILE_NAME
+from modules.selection import Selection
+from modules.sqlite_sink import SQLITE_NAME
+import modules
+import pytest
+import sqlite3
+import shutil
+import json
+import os
+
+
+def _get_source_files(base_path: str) -> list[str]:
+    distributors_path = os.path.join(base_path, "Distribuidoras")
+
+    return sorted(
+        os.path.join(distributor, type, file_name)
+        for distributor in os.listdir(distributors_path)
+        for type in ("Reajuste", "Revisão")
+        for file_name in os.listdir(os.path.join(distributors_path, distributor, type))
+    )
+
+
+def test_source_named_like_temp_copy_is_extracted_and_kept(base_path):
+    distributors_path = os.path.join(base_path, "Distribuidoras")
+    distributor = sorted(os.listdir(distributors_path))[0]
+    type_path = os.path.join(distributors_path, distributor, "Reajuste")
+    source_path = os.path.join(type_path, "processo_0.xlsx")
+    temp_named_path = os.path.join(type_path, "processo_9_temp.xlsx")
+    shutil.copyfile(source_path, temp_named_path)
+
+    process_distributors(base_path=base_path, keep_temp_files=True)
+
+    temp_folder_path = os.path.join(distributors_path, distributor, TEMP_FOLDER, "Reajuste")
+    assert os.path.exists(os.path.join(temp_folder_path, "processo_0_temp.xlsx"))
+    assert os.path.exists(os.path.join(temp_folder_path, "processo_9_temp_temp.xlsx"))
+
+    source_files = _get_source_files(base_path)
+    process_distributors(base_path=base_path)
+
+    assert _get_source_files(base_path) == source_files
+    assert not os.path.exists(os.path.join(distributors_path, distributor, TEMP_FOLDER))
+    assert Manifest.load(base_path).get_row_set(temp_named_path) is not None
+
+
+def test_selective_run_keeps_other_distributors_failures(base_path):
+    distributors_path = os.path.join(base_path, "Distribuidoras")
+    broken, selected = sorted(os.listdir(distributors_path))[:2]
+    broken_path = os.path.join(distributors_path, broken, "Reajuste", "processo_0.xlsx")
+
+    with open(broken_path, 'wb') as file:
+        file.write(b"not a workbook")
+
+    process_distributors(base_path=base_path)
+    failures = [diagnostic for diagnostic in read_report(base_path) if diagnostic.file == broken_path]
+    assert failures
+
+    process_distributors(base_path=base_path, selection=Selection.create(siglas=[selected]))
+    assert [diagnostic for diagnostic in read_report(base_path) if diagnostic.file == broken_path] == failures
+
+    process_distributors(base_path=base_path, selection=Selection.create(siglas=[broken]))
+    assert [diagnostic for diagnostic in read_report(base_path) if diagnostic.file == broken_path] == failures
+
+
+def _add_misplaced_files(base_path: str) -> tuple[str, str]:
+    distributors_path = os.path.join(base_path, "Distribuidoras")
+    owner, other = sorted(os.listdir(distributors_path))[:2]
+    source_path = os.path.join(distributors_path, owner, "Reajuste", "processo_0.xlsx")
+
+    moved_path = os.path.join(distributors_path, other, "Reajuste", "processo_novo.xlsx")
+    duplicate_path = os.path.join(distributors_path, other, "Reajuste", "processo_0_copia.xlsx")
+    shutil.copy2(source_path, moved_path)
+    shutil.copy2(source_path, duplicate_path)
+    shutil.copy2(source_path, os.path.join(distributors_path, owner, "Reajuste", "processo_0_copia.xlsx"))
+
+    return moved_path, duplicate_path
+
+
+def _get_tree(base_path: str) -> dict[str, bytes]:
+    tree = {}
+
+    for directory, _, file_names in os.walk(os.path.join(base_path, "Distribuidoras")):
+        for file_name in file_names:
+            with open(os.path.join(directory, file_name), 'rb') as file:
+                tree[os.path.relpath(os.path.join(directory, file_name), base_path)] = file.read()
+
+    return tree
+
+
+def test_failed_move_plan_puts_files_back(base_path, monkeypatch):
+    _add_misplaced_files(base_path)
+    plan = data.plan_misplaced_files(base_path=base_path)
+    assert sorted(move.action for move in plan.moves) == ["move", "remove"]
+
+    tree = _get_tree(base_path)
+    rename_file = data._rename_file
+    renames = []
+
+    def failing_rename(source: str, destination: str):
+        renames.append(source)
+
+        if len(renames) == len(plan.moves):
+            raise OSError("disco cheio")
+
+        rename_file(source, destination)
+
+    monkeypatch.setattr(data, "_rename_file", failing_rename)
+
+    with pytest.raises(OSError):
+        data.apply_move_plan(plan)
+
+    assert _get_tree(base_path) == tree
+
+
+def test_move_then_extract_reuses_covers(base_path, monkeypatch):
+    moved_path, duplicate_path = _add_misplaced_files(base_path)
+
+    monkeypatch.setattr(modules, "move_misplaced_files", partial(data.move_misplaced_files, base_path=base_path))
+    monkeypatch.setattr(modules, "process_distributors", partial(data.process_distributors, base_path=base_path, profile=True))
+
+    args = _get_parser().parse_args(["move", "--extrair"])
+    args.command(args)
+
+    assert not os.path.exists(moved_path) and not os.path.exists(duplicate_path)
+
+    with open(os.path.join(base_path, PROFILE_NAME), 'r', encoding='utf-8') as file:
+        events = [json.loads(line) for line in file]
+
+    extracted_files = {event["file"] for event in events if event.get("name") == FILE_SPAN}
+    cover_captures = [
+        event for event in events
+        if event.get("name") == "sheet_capture" and event["args"]["tab"] == "CAPA"
+    ]
+
+    assert len(extracted_files) == len(_get_source_files(base_path))
+    assert cover_captures == []
+
+
+def _read_banks(base_path: str) -> dict[str, list[tuple[any, ...]]]:
+    banks = {}
+
+    for directory, _, file_names in os.walk(base_path):
+        for file_name in file_names:
+            if file_name.endswith("BANCO.xlsx"):
+                workbook = load_workbook(os.path.join(directory, file_name), read_only=True)
+                banks[os.path.relpath(os.path.join(directory, file_name), base_path)] = list(workbook.active.iter_rows(values_only=True))
+                workbook.close()
+
+    return banks
+
+
+def test_resume_replays_journal_after_interruption(generated_tree, base_path, tmp_path, monkeypatch):
+    fresh_path = str(tmp_path / "fresh")
+    shutil.copytree(generated_tree, fresh_path)
+    process_distributors(base_path=fresh_path)
+    process_data_bases(base_path=fresh_path)
+
+    extract_file = data._extract_file
+    extracted = []
+
+    def interrupted_extract_file(job, **kwargs):
+        if len(extracted) == 6:
+            raise KeyboardInterrupt
+
+        extracted.append(job.file_path)
+        return extract_file(job, **kwargs)
+
+    monkeypatch.setattr(data, "_extract_file", interrupted_extract_file)
+
+    with pytest.raises(KeyboardInterrupt):
+        process_distributors(base_path=base_path)
+
+    assert os.path.exists(os.path.join(base_path, JOURNAL_NAME))
+
+    interrupted = list(extracted)
+    extracted.clear()
+
+    def counted_extract_file(job, **kwargs):
+        extracted.append(job.file_path)
+        return extract_file(job, **kwargs)
+
+    monkeypatch.setattr(data, "_extract_file", counted_extract_file)
+
+    process_distributors(base_path=base_path, resume=True)
+    process_data_bases(base_path=base_path)
+
+    assert not os.path.exists(os.path.join(base_path, JOURNAL_NAME))
+    assert sorted(interrupted + extracted) == sorted(
+        os.path.join(base_path, "Distribuidoras", source_file)
+        for source_file in _get_source_files(base_path)
+    )
+    assert _read_banks(base_path) == _read_banks(fresh_path)
+
+
+def _count_extractions(monkeypatch) -> list[str]:
+    extract_file = data._extract_file
+    extracted = []
+
+    def counted_extract_file(job, **kwargs):
+        extracted.append(job.file_path)
+        return extract_file(job, **kwargs)
+
+    monkeypatch.setattr(data, "_extract_file", counted_extract_file)
+
+    return extracted
+
+
+def _read_global_bank(base_path: str) -> list[tuple[any, ...]]:
+    return _read_banks(base_path)["BANCO.xlsx"]
+
+
+def test_manifest_extracts_only_what_changed(base_path, monkeypatch):
+    extracted = _count_extractions(monkeypatch)
+    distributors_path = os.path.join(base_path, "Distribuidoras")
+    source_files = [os.path.join(distributors_path, source_file) for source_file in _get_source_files(base_path)]
+
+    process_distributors(base_path=base_path)
+    process_data_bases(base_path=base_path)
+    assert sorted(extracted) == sorted(source_files)
+    rows = _read_global_bank(base_path)
+
+    extracted.clear()
+    process_distributors(base_path=base_path)
+    assert extracted == []
+
+    # touching a file without changing it is settled by its hash
+    os.utime(source_files[0])
+    process_distributors(base_path=base_path)
+    assert extracted == []
+
+    workbook = load_workbook(source_files[1])
+    workbook["CAPA"]["A1"] = "alterada"
+    workbook.save(source_files[1])
+
+    process_distributors(base_path=base_path)
+    assert extracted == [source_files[1]]
+
+    extracted.clear()
+    os.remove(source_files[2])
+    process_distributors(base_path=base_path)
+    process_data_bases(base_path=base_path)
+    assert extracted == []
+    assert len(_read_global_bank(base_path)) == len(rows) - 1
+
+    config_hashes = data.get_config_hashes()
+    monkeypatch.setattr(data, "get_config_hashes", lambda: {**config_hashes, "details.json": "outro"})
+    monkeypatch.setattr(modules.manifest, "get_config_hashes", lambda: {**config_hashes, "details.json": "outro"})
+
+    process_distributors(base_path=base_path)
+    assert sorted(extracted) == sorted(source_files[:2] + source_files[3:])
+
+
+def test_deleted_distributor_leaves_the_global_bank(base_path):
+    distributors_path = os.path.join(base_path, "Distribuidoras")
+    distributor = sorted(os.listdir(distributors_path))[0]
+    distributor_path = os.path.join(distributors_path, distributor)
+
+    process_distributors(base_path=base_path)
+    process_data_bases(base_path=base_path, sqlite=True)
+    assert any(row[0] == distributor for row in _read_global_bank(base_path))
+
+    for type in ("Reajuste", "Revisão"):
+        for file_name in os.listdir(os.path.join(distributor_path, type)):
+            os.remove(os.path.join(distributor_path, type, file_name))
+
+    process_distributors(base_path=base_path)
+    process_data_bases(base_path=base_path, sqlite=True)
+
+    assert not os.path.exists(os.path.join(distributor_path, "Banco de Dados"))
+    assert not any(row[0] == distributor for row in _read_global_bank(base_path))
+
+    connection = sqlite3.connect(os.path.join(base_path, SQLITE_NAME))
+
+    try:
+        siglas = {sigla for sigla, in connection.execute("SELECT DISTINCT sigla FROM processos")}
+    finally:
+        connection.close()
+
+    assert siglas and distributor not in siglas
+
+
+def test_missing_tab_keeps_later_values_in_their_columns(generated_tree, tmp_path):
+    plan = data.get_extraction_plan()
+    distributors_path = os.path.join(generated_tree, "Distribuidoras")
+    distributor = sorted(os.listdir(distributors_path))[0]
+    file_path = str(tmp_path / "processo.xlsx")
+    shutil.copyfile(os.path.join(distributors_path, distributor, "Revisão", "processo_1.xlsx"), file_path)
+
+    job = data.FileJob(distributor=distributor, type="Revisão", file_path=file_path)
+    complete_row = data._extract_file(job).row_set.rows[3]
+
+    workbook = load_workbook(file_path)
+    del workbook["Mercado"]
+    workbook.save(file_path)
+
+    result = data._extract_file(job)
+    row = result.row_set.rows[3]
+    fixed_width = len(plan.fixed_columns)
+    missing_steps = [
+        step for step in plan.steps
+        if step.tab_name == "Mercado" and step.kind in ("cell", "add")
+    ]
+
+    assert missing_steps
+    assert len(row) == len(complete_row)
+    assert [diagnostic[3] for diagnostic in result.diagnostics].count("missing_tab") == len(missing_steps)
+
+    for step in plan.steps:
+        column = fixed_width + step.index
+
+        if step in missing_steps:
+            assert row[column] is None
+        elif step.kind != "specific":
+            assert row[column] == complete_row[column], step
+
+    assert row[:fixed_width] == complete_row[:fixed_width]
+    assert row[fixed_width + plan.width:] == complete_row[fixed_width + plan.width:]
@@ -0,0 +1,33 @@
+from main import _extract, _get_parser, _run_all
+import pytest
+
+
+@pytest.mark.parametrize("argv, resume, command", [
+    (["--resume", "extract"], True, _extract),
+    (["extract", "--resume"], True, _extract),
+    (["extract"], False, _extract),
+    (["--resume"], True, _run_all),
+    ([], False, _run_all)
+])
+def test_resume_flag(argv, resume, command):
+    args = _get_parser().parse_args(argv)
+
+    assert args.resume is resume
+    assert args.command is command
+
+
+@pytest.mark.parametrize("argv, sqlite", [
+    (["extract", "--sqlite"], True),
+    (["extract"], False)
+])
+def test_extract_passes_sqlite(monkeypatch, argv, sqlite):
+    import modules
+
+    calls = []
+    monkeypatch.setattr(modules, "process_distributors", lambda **kwargs: calls.append(kwargs))
+
+    args = _get_parser().parse_args(argv)
+    args.command(args)
+
+    assert len(calls) == 1
+    assert calls[0]["sqlite"] is sqlite
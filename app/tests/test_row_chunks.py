@@ -0,0 +1,114 @@
+from datetime import date, datetime
+from modules.bank_files import CHUNK_SUFFIX
+from modules.data import _iter_db_rows, _mix_rows, process_data_bases, process_distributors
+from modules.row_chunks import RowChunk, get_chunk_path, write_chunk
+from openpyxl import load_workbook
+import random
+import os
+
+
+CASES = 400
+
+
+def _get_value(rng: random.Random) -> any:
+    return rng.choice([
+        None,
+        True,
+        rng.randint(-10 ** 6, 10 ** 6),
+        rng.randint(-2 ** 70, 2 ** 70),
+        rng.random() * 10 ** rng.randint(-8, 20),
+        float("nan"),
+        float("inf"),
+        "",
+        "=SOMA(A1)",
+        "=",
+        " texto com espaços ",
+        "Revisão",
+        "-",
+        datetime(2000 + rng.randint(0, 30), rng.randint(1, 12), rng.randint(1, 28), rng.randint(0, 23), rng.randint(0, 59), rng.randint(0, 59), rng.randint(0, 999999)),
+        date(2000 + rng.randint(0, 30), rng.randint(1, 12), rng.randint(1, 28))
+    ])
+
+
+def _get_rows(rng: random.Random, count: int, width: int) -> list[tuple[any, ...]]:
+    rows = []
+
+    for _ in range(count):
+        row = [_get_value(rng) for _ in range(rng.randint(0, width))]
+
+        # trailing empty cells are the case the bank drops when reading back
+        row += [None] * rng.choice([0, 0, 1, 3])
+        rows.append(tuple(row))
+
+    return rows
+
+
+def test_chunk_reads_back_like_the_xlsx_bank(tmp_path):
+    rng = random.Random(21)
+    bank_path = str(tmp_path / "BANCO.xlsx")
+    chunk_path = get_chunk_path(bank_path)
+
+    for case in range(CASES):
+        header_rows = _get_rows(rng, 3, 6)
+        rows = _get_rows(rng, rng.randint(0, 8), 8)
+
+        _mix_rows(header_rows, rows, bank_path)
+        write_chunk(chunk_path, bank_path, header_rows, rows)
+
+        chunk = RowChunk.open(chunk_path, bank_path)
+
+        assert chunk is not None
+        assert chunk.header_rows == tuple(_iter_db_rows(bank_path, max_row=3)), f"case {case}"
+        assert list(chunk.iter_rows()) == list(_iter_db_rows(bank_path, min_row=4)), f"case {case}"
+
+
+def test_stale_chunk_is_ignored(tmp_path):
+    bank_path = str(tmp_path / "BANCO.xlsx")
+    chunk_path = get_chunk_path(bank_path)
+    rows = [(1, "a"), (2, "b")]
+
+    _mix_rows([("h",)], rows, bank_path)
+    write_chunk(chunk_path, bank_path, [("h",)], rows)
+    assert RowChunk.open(chunk_path, bank_path) is not None
+
+    _mix_rows([("h",)], rows + [(3, "c")], bank_path)
+    assert RowChunk.open(chunk_path, bank_path) is None
+
+
+def _read_bank(file_path: str) -> list[tuple[any, ...]]:
+    workbook = load_workbook(file_path, read_only=True)
+
+    try:
+        return [
+            tuple(row)
+            for sheet in workbook.worksheets
+            for row in sheet.iter_rows(values_only=True)
+        ]
+    finally:
+        workbook.close()
+
+
+def test_global_bank_from_chunks_matches_xlsx_fallback(base_path):
+    process_distributors(base_path=base_path)
+    process_data_bases(base_path=base_path)
+
+    bank_path = os.path.join(base_path, "BANCO.xlsx")
+    from_chunks = _read_bank(bank_path)
+
+    chunk_paths = [
+        os.path.join(directory, file_name)
+        for directory, _, file_names in os.walk(os.path.join(base_path, "Distribuidoras"))
+        for file_name in file_names
+        if file_name.endswith(CHUNK_SUFFIX)
+    ]
+
+    assert len(chunk_paths) == len(os.listdir(os.path.join(base_path, "Distribuidoras")))
+    assert all(RowChunk.open(chunk_path, chunk_path[:-len(CHUNK_SUFFIX)] + ".xlsx") for chunk_path in chunk_paths)
+
+    for chunk_path in chunk_paths:
+        os.remove(chunk_path)
+
+    process_data_bases(base_path=base_path, incremental=False)
+
+    assert len(from_chunks) > 3
+    assert _read_bank(bank_path) == from_chunks
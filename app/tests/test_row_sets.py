@@ -0,0 +1,28 @@
+from modules.row_sets import RowSet, get_year_sort_key, merge_row_sets
+
+
+HEADER_ROWS = (("a",), ("b",), ("c",))
+
+
+def _get_row_set(year: any, *names: str) -> RowSet:
+    return RowSet(sort_key=get_year_sort_key(year), rows=HEADER_ROWS + tuple((name, year) for name in names))
+
+
+def test_dash_years_sort_after_numeric_years():
+    row_sets = [
+        _get_row_set("-", "sem data"),
+        _get_row_set(2021, "2021 a", "2021 b"),
+        _get_row_set(2019.0, "2019"),
+        _get_row_set(None, "sem ano"),
+        _get_row_set(2021, "2021 c"),
+        _get_row_set(2018, "2018")
+    ]
+
+    assert [name for name, _ in merge_row_sets(row_sets)] == [
+        "2018", "2019", "2021 a", "2021 b", "2021 c", "sem data", "sem ano"
+    ]
+
+
+def test_boolean_years_are_not_numeric():
+    assert get_year_sort_key(True) == get_year_sort_key("-")
+    assert get_year_sort_key(2020) < get_year_sort_key("-")
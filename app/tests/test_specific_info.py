@@ -0,0 +1,130 @@
+from openpyxl import Workbook, load_workbook
+from modules.data import _get_sheet_requests, _open_workbook
+from modules.extraction_plan import get_extraction_plan, get_OM_plan
+from modules.sheet_snapshot import WorkbookSnapshot
+from modules.specific_info import _get_detailed_info, _get_OM_values
+from modules.utils import normalize
+import random
+import pytest
+
+
+LAYOUTS = 50
+
+
+def _vary_label(label: str, rng: random.Random) -> str:
+    label = rng.choice([label, label.upper(), label.lower()])
+    return f"{' ' * rng.randint(0, 2)}{label}{' ' * rng.randint(0, 2)}"
+
+
+def _get_value(rng: random.Random) -> any:
+    return rng.choice([
+        rng.randint(-10 ** 6, 10 ** 6),
+        round(rng.random() * 10 ** 6, 3),
+        "valor",
+        "-",
+        "#REF!",
+        None
+    ])
+
+
+def _write_entrada(file_path: str, rng: random.Random):
+    OM_plan = get_OM_plan()
+    workbook = Workbook()
+    tab = workbook.active
+    tab.title = "Entrada"
+
+    all_sub_items = [sub_item for sub_items in OM_plan.sub_items for sub_item in sub_items]
+    row = rng.randint(7, 12)
+
+    for index, item in enumerate(OM_plan.items):
+        if rng.random() < 0.1:
+            continue
+
+        section_label = item if index == len(OM_plan.items) - 1 else f"Conta {item}"
+        tab.cell(row, 10, _vary_label(section_label, rng))
+
+        # a repeated section label further down must not be the one that's used
+        if rng.random() < 0.1:
+            tab.cell(row + rng.randint(1, 60), 10, section_label)
+
+        offset = 0
+
+        for sub_item in OM_plan.sub_items[index]:
+            if rng.random() < 0.1:
+                continue
+
+            offset += rng.choice([0, 1, 1, 1, 2, 40])
+            tab.cell(row + offset, 11, _vary_label(sub_item, rng))
+            tab.cell(row + offset, 12, _get_value(rng))
+            tab.cell(row + offset, 13, _get_value(rng))
+            offset += 1
+
+        for _ in range(rng.randint(0, 3)):
+            tab.cell(row + rng.randint(0, 40), 11, rng.choice(all_sub_items))
+
+        row += offset + rng.randint(0, 5)
+
+    workbook.save(file_path)
+
+
+def _open(file_path: str, reader: str):
+    if reader == "openpyxl":
+        return load_workbook(file_path, data_only=True)
+
+    backend = reader.split("-")[1]
+
+    return WorkbookSnapshot(
+        workbook=_open_workbook(file_path, backend),
+        requests=_get_sheet_requests(get_extraction_plan())
+    )
+
+
+def _get_OM_values_per_item(workbook: Workbook, t_column_indexes: list[int]) -> dict[tuple[int, int, int], any]:
+    # the per-sub-item search get_real_OM_headers used before the single pass over Entrada
+    OM_plan = get_OM_plan()
+    items = OM_plan.items
+    values = {}
+
+    for t, t_column_index in enumerate(t_column_indexes):
+        for i, main_item in enumerate(items):
+            target_value = normalize(main_item) if i == len(items) - 1 else f"CONTA {normalize(main_item)}"
+
+            for j, minor_item in enumerate(OM_plan.sub_items[i]):
+                value = _get_detailed_info(
+                    workbook=workbook,
+                    default_tab_name="",
+                    default_coordinate="",
+                    alternate_tab_name="Entrada",
+                    min_row=7,
+                    offset_to_max_row=32,
+                    first_column_index=10,
+                    second_column_index=11,
+                    target_value=target_value,
+                    second_target_value=normalize(minor_item),
+                    column_offset=t_column_index - 11
+                )
+
+                if value is not None:
+                    values[(t, i, j)] = value
+
+    return values
+
+
+@pytest.mark.parametrize("reader", ["openpyxl", "snapshot-openpyxl", "snapshot-xlsx"])
+def test_OM_values_match_per_item_search(reader, tmp_path):
+    rng = random.Random(18)
+
+    for layout in range(LAYOUTS):
+        file_path = str(tmp_path / f"entrada_{layout}.xlsx")
+        _write_entrada(file_path, rng)
+        t_column_indexes = rng.choice([[12, 13], [13, 12]])
+
+        workbook = _open(file_path, reader)
+
+        try:
+            expected = _get_OM_values_per_item(workbook, t_column_indexes)
+            values = _get_OM_values(workbook["Entrada"], get_OM_plan(), t_column_indexes)
+        finally:
+            workbook.close()
+
+        assert {key: value for key, value in values.items() if value is not None} == expected, f"layout {layout}"
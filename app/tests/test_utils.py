@@ -0,0 +1,57 @@
+from modules.utils import normalize
+import unicodedata
+import random
+import pytest
+
+
+def _reference_normalize(text: str) -> str:
+    # the NFD + combining-mark implementation normalize has to stay identical to
+    if not isinstance(text, str):
+        return ""
+
+    text = text.strip().upper()
+
+    return ''.join(
+        c for c in unicodedata.normalize('NFD', text)
+        if unicodedata.category(c) != 'Mn'
+    )
+
+
+LATIN_1 = [chr(code) for code in range(0x100)]
+COMBINING_MARKS = [chr(code) for code in range(0x300, 0x370)]
+OUTSIDE_LATIN_1_UPPERCASE = ["ÿ", "µ", "ß", "ŉ", "ǰ", "ﬀ"]
+
+
+@pytest.mark.parametrize("character", LATIN_1 + COMBINING_MARKS + OUTSIDE_LATIN_1_UPPERCASE)
+def test_single_characters_match_reference(character):
+    for text in (character, f"a{character}", f"{character}é", f"  {character} "):
+        assert normalize(text) == _reference_normalize(text)
+
+
+def test_mixed_texts_match_reference():
+    rng = random.Random(19)
+    alphabet = LATIN_1 + COMBINING_MARKS + OUTSIDE_LATIN_1_UPPERCASE + ["ŀ", "Ω", "ḉ", "𝔄"]
+
+    for _ in range(5000):
+        text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 12)))
+        assert normalize(text) == _reference_normalize(text), repr(text)
+
+
+def test_labels_match_reference():
+    for text in ["Receita Irrecuperável", "Fator IGP- M", "CONTA Pessoal", "Revisão", "  ção  ", ""]:
+        assert normalize(text) == _reference_normalize(text)
+
+
+@pytest.mark.parametrize("value", [None, 1, 1.5, b"abc"])
+def test_non_strings_normalize_to_empty(value):
+    assert normalize(value) == ""
+
+
+def test_every_code_point_matches_reference():
+    mismatches = [
+        code for code in range(0x110000)
+        if not 0xD800 <= code <= 0xDFFF
+        and normalize(chr(code)) != _reference_normalize(chr(code))
+    ]
+
+    assert mismatches == []
@@ -0,0 +1,53 @@
+from modules import watcher
+from modules.data import process_data_bases, process_distributors
+from openpyxl import load_workbook
+import shutil
+import os
+
+
+def _read_global_bank(base_path: str) -> list[tuple[any, ...]]:
+    workbook = load_workbook(os.path.join(base_path, "BANCO.xlsx"), read_only=True)
+
+    try:
+        return list(workbook.active.iter_rows(values_only=True))
+    finally:
+        workbook.close()
+
+
+def test_watch_catches_up_on_changes_made_while_stopped(base_path, tmp_path, monkeypatch):
+    process_distributors(base_path=base_path)
+    process_data_bases(base_path=base_path)
+
+    distributors_path = os.path.join(base_path, "Distribuidoras")
+    removed, changed = sorted(os.listdir(distributors_path))[:2]
+
+    for type in ("Reajuste", "Revisão"):
+        type_path = os.path.join(distributors_path, removed, type)
+
+        for file_name in os.listdir(type_path):
+            os.remove(os.path.join(type_path, file_name))
+
+    os.remove(os.path.join(distributors_path, changed, "Revisão", "processo_1.xlsx"))
+
+    fresh_path = str(tmp_path / "fresh")
+    shutil.copytree(base_path, fresh_path, ignore=shutil.ignore_patterns("Banco de Dados", ".banco_*", "BANCO*"))
+
+    scan_tree = watcher.scan_tree
+    scans = []
+
+    def stopping_scan_tree(path: str):
+        scans.append(path)
+
+        if len(scans) > 1:
+            raise KeyboardInterrupt
+
+        return scan_tree(path)
+
+    monkeypatch.setattr(watcher, "scan_tree", stopping_scan_tree)
+    watcher.watch(use_observer=False, poll_seconds=0, base_path=base_path)
+
+    process_distributors(base_path=fresh_path)
+    process_data_bases(base_path=fresh_path)
+
+    assert not any(row[0] == removed for row in _read_global_bank(base_path))
+    assert _read_global_bank(base_path) == _read_global_bank(fresh_path)
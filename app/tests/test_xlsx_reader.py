@@ -0,0 +1,52 @@
+from openpyxl import load_workbook
+from modules.data import FileJob, _extract_file, _get_file_jobs, process_data_bases, process_distributors
+import shutil
+import os
+
+
+def _read_bank(file_path: str) -> list[tuple[any, ...]]:
+    workbook = load_workbook(file_path, read_only=True)
+
+    try:
+        return [tuple(row) for row in workbook.active.iter_rows(values_only=True)]
+    finally:
+        workbook.close()
+
+
+def _get_jobs(base_path: str) -> list[FileJob]:
+    distributors_path = os.path.join(base_path, "Distribuidoras")
+    return _get_file_jobs(distributors_path, sorted(os.listdir(distributors_path)))
+
+
+def test_backends_extract_the_same_rows(generated_tree):
+    jobs = _get_jobs(generated_tree)
+    assert any(job.file_path.endswith(".xlsm") for job in jobs)
+
+    for job in jobs:
+        xlsx_result = _extract_file(job, backend="xlsx")
+        openpyxl_result = _extract_file(job, backend="openpyxl")
+
+        assert xlsx_result.error is None and openpyxl_result.error is None
+        assert xlsx_result.row_set == openpyxl_result.row_set, job.file_path
+        assert xlsx_result.diagnostics == openpyxl_result.diagnostics, job.file_path
+
+
+def test_backends_build_identical_banks(generated_tree, tmp_path):
+    banks = {}
+
+    for backend in ("xlsx", "openpyxl"):
+        base_path = str(tmp_path / backend)
+        shutil.copytree(generated_tree, base_path)
+
+        process_distributors(base_path=base_path, backend=backend, incremental=False)
+        process_data_bases(base_path=base_path, incremental=False)
+
+        banks[backend] = {
+            os.path.relpath(os.path.join(directory, file_name), base_path): _read_bank(os.path.join(directory, file_name))
+            for directory, _, file_names in os.walk(base_path)
+            for file_name in file_names
+            if file_name.endswith("BANCO.xlsx")
+        }
+
+    assert len(banks["xlsx"]) == len(os.listdir(os.path.join(generated_tree, "Distribuidoras"))) + 1
+    assert banks["xlsx"] == banks["openpyxl"]